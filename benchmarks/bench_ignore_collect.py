@@ -0,0 +1,105 @@
+"""Micro-benchmark of collection on a tree with large subtrees ignored by pylintrc.
+
+Compares collection of lint items with ignored directories pruned in
+``pytest_ignore_collect`` (``-m pylint`` run) against the full tree walk where
+every file is matched one by one, and the per path cost of the compiled
+``IgnoreMatcher`` against the uncompiled matching it replaced.
+
+Usage::
+
+    python benchmarks/bench_ignore_collect.py --files 500 --ignored-files 20000
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+from synthetic_repo import plugin_args
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pytest_pylint_xdist_vcs import IgnoreMatcher  # pylint: disable=wrong-import-position
+
+
+PYLINTRC = """[MASTER]
+
+ignore=CVS,migrations,vendor
+ignore-patterns=.*_pb2.py$,generated.*
+"""
+
+
+def legacy_include_file(path, ignore_list, ignore_patterns=None):
+    """Uncompiled matching as it was done for every collected file"""
+    if ignore_patterns:
+        for pattern in ignore_patterns:
+            if re.match(pattern, path):
+                return False
+    parts = path.split(os.sep)
+    return not set(parts) & set(ignore_list)
+
+
+def make_tree(root, files, ignored_files, files_per_dir=50):
+    """Create linted packages and the ignored subtrees of the same depth"""
+    def write_files(base, count):
+        for index in range(count):
+            directory = os.path.join(base, 'pkg_{0}'.format(index // files_per_dir))
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+                open(os.path.join(directory, '__init__.py'), 'w').close()
+            with open(os.path.join(directory, 'mod_{0}.py'.format(index)), 'w') as module:
+                module.write('"""Module {0}"""\n'.format(index))
+
+    write_files(os.path.join(root, 'src'), files)
+    for ignored_dir in ('migrations', 'vendor', 'generated'):
+        write_files(os.path.join(root, ignored_dir), ignored_files // 3)
+    with open(os.path.join(root, 'pylintrc'), 'w') as pylintrc:
+        pylintrc.write(PYLINTRC)
+
+
+def collect_time(root, markexpr, repeat):
+    """Best wall time of lint items collection in a fresh interpreter"""
+    command = [sys.executable, '-m', 'pytest', '--collect-only', '-q', '-p', 'no:cacheprovider',
+               '--pylint', '--pylint-rcfile=pylintrc', '-m', markexpr] + plugin_args()
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.check_call(command, cwd=root, env=env, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    """Run the benchmark and print the results"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--files', type=int, default=500, help='number of linted files')
+    parser.add_argument('--ignored-files', type=int, default=15000, help='number of files in ignored directories')
+    parser.add_argument('--repeat', type=int, default=3, help='collection runs to take the best of')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root, args.files, args.ignored_files)
+        # "pylint or pylint" selects the same items, but only plain "pylint" enables pruning
+        pruned = collect_time(root, 'pylint', args.repeat)
+        walked = collect_time(root, 'pylint or pylint', args.repeat)
+
+    ignore_list = ['CVS', 'migrations', 'vendor']
+    ignore_patterns = [r'.*_pb2.py$', 'generated.*']
+    path = os.path.join('src', 'pkg_3', 'mod_150.py')
+    matcher = IgnoreMatcher(ignore_list, ignore_patterns)
+    number = 100000
+    legacy = timeit.timeit(lambda: legacy_include_file(path, ignore_list, ignore_patterns), number=number)
+    compiled = timeit.timeit(lambda: matcher.ignores(path), number=number)
+
+    print('collection of {0} files with {1} ignored ones:'.format(args.files, args.ignored_files))
+    print('  {0:<22}{1:8.3f} s'.format('full walk', walked))
+    print('  {0:<22}{1:8.3f} s'.format('ignored dirs pruned', pruned))
+    print('path check:')
+    print('  {0:<22}{1:8.3f} us'.format('uncompiled', legacy / number * 1e6))
+    print('  {0:<22}{1:8.3f} us'.format('IgnoreMatcher', compiled / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
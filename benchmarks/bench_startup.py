@@ -0,0 +1,93 @@
+"""Startup benchmark of what the plugin adds to pytest runs without linting.
+
+Compares ``pytest --collect-only`` of a generated synthetic repository with the
+plugin loaded and without it, and measures the import time of the plugin module
+in a fresh interpreter with pytest already imported, listing the heavy modules
+(pylint, astroid and the VCS backends) the import loaded.
+
+Usage::
+
+    python benchmarks/bench_startup.py --files 200 --repeat 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic_repo import make_repo, plugin_args
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+HEAVY_MODULES = ('pylint', 'astroid', 'svn', 'git')
+
+IMPORT_SCRIPT = """
+import sys
+import time
+import pytest
+start = time.perf_counter()
+import pytest_pylint_xdist_vcs
+print(time.perf_counter() - start)
+print(' '.join(name for name in {0!r} if name in sys.modules))
+""".format(HEAVY_MODULES)
+
+
+def environment():
+    """Environment of the measured interpreters, the plugin is loaded only by the arguments"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    env.pop('PYTEST_PLUGINS', None)
+    env.pop('PYTEST_ADDOPTS', None)
+    return env
+
+
+def collect_time(root, plugin, repeat):
+    """Best wall time of ``pytest --collect-only`` in a fresh interpreter with or without the plugin"""
+    if plugin:
+        args = plugin_args()
+    else:
+        # The plugin installed with its entry point is registered as ``pylint``
+        args = [] if plugin_args() else ['-p', 'no:pylint']
+    command = [sys.executable, '-m', 'pytest', '--collect-only', '-q', '-p', 'no:cacheprovider'] + args
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.call(command, cwd=root, env=environment(), stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def import_time(repeat):
+    """Best import time of the plugin module and the heavy modules it imported"""
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', IMPORT_SCRIPT], env=environment()).decode()
+        seconds, imported = (output.split('\n') + [''])[:2]
+        timings.append(float(seconds))
+    return min(timings), imported.split()
+
+
+def main():
+    """Run the benchmark and print the results"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--files', type=int, default=200, help='number of files of the collected repository')
+    parser.add_argument('--repeat', type=int, default=5, help='runs to take the best of')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        make_repo(root, args.files, module_lines=20, fan_out=1, ignored_ratio=0)
+        without_plugin = collect_time(root, False, args.repeat)
+        with_plugin = collect_time(root, True, args.repeat)
+    seconds, imported = import_time(args.repeat)
+
+    print('pytest --collect-only of {0} files without linting:'.format(args.files))
+    print('  {0:<22}{1:8.3f} s'.format('without plugin', without_plugin))
+    print('  {0:<22}{1:8.3f} s'.format('with plugin', with_plugin))
+    print('  {0:<22}{1:8.3f} s'.format('added by plugin', with_plugin - without_plugin))
+    print('plugin import:')
+    print('  {0:<22}{1:8.3f} s'.format('import time', seconds))
+    print('  {0:<22}{1}'.format('heavy modules loaded', ', '.join(imported) or 'none'))
+
+
+if __name__ == '__main__':
+    main()
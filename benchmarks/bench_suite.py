@@ -0,0 +1,110 @@
+"""Benchmark suite of the plugin hot paths on a generated synthetic repository.
+
+Measures collection of lint items, lint time per file, ``svn.get_mod_files``
+parsing of large ``svn diff --summarize`` output and scaling of a lint run over
+xdist workers, then writes the results with the parameters to a JSON file,
+so results of two revisions can be compared.
+
+Usage::
+
+    python benchmarks/bench_suite.py --files 200 --module-lines 200 --workers 0,2,4 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import timeit
+from unittest.mock import patch
+
+import pylint
+import pytest
+
+from synthetic_repo import make_repo, pytest_time, svn_summary
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import svn  # pylint: disable=wrong-import-position,wrong-import-order
+
+
+def lint_args():
+    """Arguments of lint only run with the generated pylintrc"""
+    return ['--pylint', '--pylint-rcfile=pylintrc', '-m', 'pylint']
+
+
+def bench_collection(root, repeat):
+    """Best wall time of collecting the lint items"""
+    return {'seconds': pytest_time(root, ['--collect-only'] + lint_args(), repeat)}
+
+
+def bench_lint(root):
+    """Lint time per file and the time of pylint checkers from ``--pylint-timings-json``"""
+    timings_path = os.path.join(root, 'timings.json')
+    wall = pytest_time(root, lint_args() + ['--pylint-timings-json={0}'.format(timings_path)])
+    with open(timings_path) as timings_file:
+        timings = json.load(timings_file)
+    files = sorted(timings['files'].values())
+    return {
+        'wall_seconds': wall,
+        'files': len(files),
+        'mean_file_seconds': sum(files) / len(files) if files else 0.0,
+        'median_file_seconds': files[len(files) // 2] if files else 0.0,
+        'max_file_seconds': files[-1] if files else 0.0,
+        'checkers_seconds': timings['checkers'],
+    }
+
+
+def bench_svn_parse(root, lines, number):
+    """Time of ``svn.get_mod_files`` parsing fake output of ``lines`` entries"""
+    output = svn_summary(root, lines).encode()
+    with patch('svn.subprocess.check_output', return_value=output):
+        changed = len(svn.get_mod_files(root))
+        seconds = timeit.timeit(lambda: svn.get_mod_files(root), number=number) / number
+    return {'lines': lines, 'changed_files': changed, 'seconds': seconds, 'seconds_per_line': seconds / lines}
+
+
+def bench_scaling(root, workers):
+    """Wall time of the lint run by number of xdist workers, 0 runs without distribution"""
+    return {
+        str(count): pytest_time(root, lint_args() + ['-n', str(count)])
+        for count in workers
+    }
+
+
+def main():
+    """Run the benchmarks and write the results"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--files', type=int, default=200, help='number of linted files')
+    parser.add_argument('--module-lines', type=int, default=200, help='approximate lines of every module')
+    parser.add_argument('--fan-out', type=int, default=5, help='number of modules every module imports')
+    parser.add_argument('--ignored-ratio', type=float, default=0.2,
+                        help='part of generated files in directory ignored by pylintrc')
+    parser.add_argument('--svn-lines', type=int, default=50000, help='entries of fake svn diff output')
+    parser.add_argument('--workers', default='0,2,4', help='comma separated numbers of xdist workers')
+    parser.add_argument('--repeat', type=int, default=3, help='collection runs to take the best of')
+    parser.add_argument('--output', default='bench.json', help='path of JSON file with the results')
+    args = parser.parse_args()
+    workers = [int(count) for count in args.workers.split(',') if count]
+
+    results = {
+        'parameters': vars(args),
+        'environment': {
+            'python': platform.python_version(),
+            'pylint': pylint.__version__,
+            'pytest': pytest.__version__,
+            'cpus': os.cpu_count(),
+        },
+    }
+    with tempfile.TemporaryDirectory() as root:
+        make_repo(root, args.files, args.module_lines, args.fan_out, args.ignored_ratio)
+        results['collection'] = bench_collection(root, args.repeat)
+        results['lint'] = bench_lint(root)
+        results['svn_get_mod_files'] = bench_svn_parse(root, args.svn_lines, args.repeat)
+        results['scaling_seconds'] = bench_scaling(root, workers)
+
+    with open(args.output, 'w') as output:
+        json.dump(results, output, indent=2, sort_keys=True)
+    print(json.dumps(results, indent=2, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Generator of synthetic repositories and helpers shared by the benchmarks.
+
+The generated tree has ``src/pkg_<n>/mod_<n>.py`` linted modules, every module
+importing ``fan_out`` preceding ones, so astroid inference crosses modules as in
+a real code base, and a ``vendor`` directory ignored by the generated pylintrc.
+"""
+import os
+import subprocess
+import sys
+import time
+
+import pkg_resources
+
+
+PYLINTRC = """[MASTER]
+
+ignore=vendor
+
+[MESSAGES CONTROL]
+
+disable=missing-docstring,too-few-public-methods,unused-import
+"""
+
+FUNCTION_TEMPLATE = '''
+
+def function_{index}(value):
+    """Function {index}"""
+    result = value * {index}
+    if result > {index}:
+        result -= {index}
+    return result
+'''
+
+SVN_ITEMS = ('modified', 'added', 'none', 'deleted', 'replaced')
+
+
+def module_source(index, lines, fan_out, module_names):
+    """Source of ``index`` module about ``lines`` long importing ``fan_out`` preceding modules"""
+    imported = module_names[max(0, index - fan_out):index]
+    source = ['"""Module {0}"""'.format(index)]
+    source.extend('import {0}'.format(name) for name in imported)
+    source.append('')
+    source.append('')
+    source.append('def imported_{0}():'.format(index))
+    source.append('    """Call the imported modules"""')
+    source.append('    return [{0}]'.format(', '.join(
+        '{0}.function_0(1)'.format(name) for name in imported)))
+    body_lines = max(1, lines - len(source))
+    function_lines = FUNCTION_TEMPLATE.count('\n')
+    for function_index in range(max(1, body_lines // function_lines)):
+        source.append(FUNCTION_TEMPLATE.format(index=function_index).rstrip('\n'))
+    return '\n'.join(source) + '\n'
+
+
+def make_repo(root, files=200, module_lines=200, fan_out=5, ignored_ratio=0.2, files_per_package=50):
+    """Create the synthetic repository in ``root`` and return paths of its linted modules.
+
+    ``ignored_ratio`` is the part of all generated files placed in the ignored directory.
+    """
+    module_names = []
+    paths = []
+    for index in range(files):
+        package = 'pkg_{0}'.format(index // files_per_package)
+        module_names.append('{0}.mod_{1}'.format(package, index))
+        paths.append(os.path.join(root, 'src', package, 'mod_{0}.py'.format(index)))
+    for index, path in enumerate(paths):
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+            open(os.path.join(directory, '__init__.py'), 'w').close()
+        with open(path, 'w') as module:
+            module.write(module_source(index, module_lines, fan_out, module_names))
+
+    ignored_files = int(files * ignored_ratio / (1 - ignored_ratio)) if ignored_ratio < 1 else 0
+    for index in range(ignored_files):
+        directory = os.path.join(root, 'vendor', 'pkg_{0}'.format(index // files_per_package))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(os.path.join(directory, 'mod_{0}.py'.format(index)), 'w') as module:
+            module.write('"""Vendored module {0}"""\n'.format(index))
+
+    with open(os.path.join(root, 'pylintrc'), 'w') as pylintrc:
+        pylintrc.write(PYLINTRC)
+    return paths
+
+
+def svn_summary(root, lines):
+    """Fake ``svn diff --summarize --xml`` output of ``lines`` entries with every item svn reports"""
+    entries = ['<?xml version="1.0" encoding="UTF-8"?>', '<diff>', '<paths>']
+    for index in range(lines):
+        item = SVN_ITEMS[index % len(SVN_ITEMS)]
+        suffix = '.py' if index % 3 else '.txt'
+        entries.append('<path item="{0}" props="{1}" kind="file">{2}/src/pkg_{3}/mod_{4}{5}</path>'.format(
+            item, 'modified' if item == 'none' else 'none', root, index // 50, index, suffix))
+    entries.extend(['</paths>', '</diff>'])
+    return '\n'.join(entries) + '\n'
+
+
+def plugin_args():
+    """Load the plugin explicitly unless it is installed with its entry point"""
+    for entry_point in pkg_resources.iter_entry_points('pytest11'):
+        if entry_point.module_name == 'pytest_pylint_xdist_vcs':
+            return []
+    return ['-p', 'pytest_pylint_xdist_vcs']
+
+
+def pytest_time(root, args, repeat=1):
+    """Best wall time of pytest run with ``args`` in a fresh interpreter"""
+    command = [sys.executable, '-m', 'pytest', '-q', '-p', 'no:cacheprovider'] + list(args) + plugin_args()
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        # Lint failures are expected, only the time matters
+        subprocess.call(command, cwd=root, env=env, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
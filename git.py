@@ -0,0 +1,63 @@
+"""Functions to get information from git."""
+import logging
+import os.path
+import subprocess
+
+
+LOG = logging.getLogger('pytest_pylint_xdist_vcs')
+
+# Hash of the tree without files, the base to diff against when there is no parent commit
+EMPTY_TREE = '4b825dc642cb6eb9a060e54bf8d69288fbee4904'
+
+
+def repository_root(path):
+    """Returns the root of the repository as an absolute path."""
+    try:
+        git_output = subprocess.check_output(
+            ['git', '-C', path, 'rev-parse', '--show-toplevel'], stderr=subprocess.DEVNULL).decode()
+    except OSError:
+        LOG.warning('Git is not installed or is not executable')
+        return None
+    except subprocess.CalledProcessError:
+        return None
+    return git_output.rstrip('\n') or None
+
+
+def get_mod_files(root, since=None):
+    """Returns a list of files that has been modified since the ``since`` commit.
+    Single ``git diff`` of the commit against the working tree covers the commits
+    made after it together with staged and not staged changes, ``git ls-files``
+    adds the untracked files which are not ignored.
+    Args:
+      root: string representing rootpath of the repository, it has to be an absolute path.
+      since: the commit to compare with, the last commit changes are returned by default.
+    Returns: a list with unique modified py files
+    Raises: ValueError if the given ``since`` commit is not found.
+    """
+    assert os.path.isabs(root), "Root has to be absolute, got: %s" % root
+
+    try:
+        git_diff_output = _diff_names(root, since or 'HEAD~1')
+    except subprocess.CalledProcessError as error:
+        if since:
+            raise ValueError('Git revision {0} not found: {1}'.format(
+                since, error.stderr.decode(errors='replace').strip()))
+        # the last commit has no parent or repository has no commits yet
+        LOG.warning('Git revision HEAD~1 not found, all tracked files are considered changed')
+        git_diff_output = _diff_names(root, EMPTY_TREE)
+    paths = git_diff_output.split('\0') + _untracked_names(root).split('\0')
+    return [os.path.join(root, path) for path in paths if path]
+
+
+def _diff_names(root, since):
+    """Returns NUL separated paths of not deleted py files differing from the commit"""
+    return subprocess.check_output(
+        ['git', '-C', root, 'diff', '--name-only', '-z', '--diff-filter=d', since, '--', '*.py'],
+        stderr=subprocess.PIPE).decode()
+
+
+def _untracked_names(root):
+    """Returns NUL separated paths of untracked py files of the working tree, ignored files excluded"""
+    return subprocess.check_output(
+        ['git', '-C', root, 'ls-files', '--others', '--exclude-standard', '-z', '--', '*.py'],
+        stderr=subprocess.PIPE).decode()
@@ -0,0 +1,229 @@
+"""Lint daemon keeping warm linters between pytest runs and its client used by --pylint-daemon.
+
+Run the daemon with ``python -m lint_daemon --socket SOCKET``. The plugin imports
+this module only with --pylint-daemon.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+from os.path import exists
+from os.path import join
+import signal
+import socket
+import sys
+
+
+# Seconds the client waits for the lint daemon to accept a request and to lint its files
+DAEMON_CONNECT_TIMEOUT = 5.0
+DAEMON_READ_TIMEOUT = 300.0
+
+
+class LintDaemonClient:
+    """Sends lint requests of the session to the lint daemon.
+
+    The request carries everything the result depends on besides the files: the
+    python, pylint and astroid versions, the working directory, ``sys.path`` and
+    the resolved pylintrc file. The first failed request, including a daemon not
+    answering in ``DAEMON_CONNECT_TIMEOUT`` and ``DAEMON_READ_TIMEOUT`` seconds,
+    switches the session to linting in the process.
+    """
+
+    def __init__(self, socket_path, session_token, root):
+        self.socket_path = socket_path
+        self.session_token = session_token
+        self.root = root
+        self.available = True
+
+    def lint(self, paths, pylintrc_file, timings, reporter_options):
+        """Returns ``pylint_engine.lint_files`` result of the daemon or None if it failed to lint"""
+        if not self.available:
+            return None
+        import pylint_engine  # pylint: disable=import-outside-toplevel
+        from pylint.config import PYLINTRC  # pylint: disable=import-outside-toplevel
+        request = {
+            'versions': pylint_engine.lint_versions(),
+            'cwd': os.getcwd(),
+            'sys_path': sys.path,
+            'session': self.session_token,
+            'root': self.root,
+            'paths': list(paths),
+            # pylint falls back to the file found when it was imported, the daemon imported it elsewhere
+            'pylintrc_file': pylintrc_file or PYLINTRC,
+            'timings': timings,
+            'reporter_options': reporter_options,
+        }
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+                connection.settimeout(DAEMON_CONNECT_TIMEOUT)
+                connection.connect(self.socket_path)
+                connection.settimeout(DAEMON_READ_TIMEOUT)
+                with connection.makefile('rwb') as stream:
+                    stream.write(json.dumps(request).encode() + b'\n')
+                    stream.flush()
+                    response = json.loads(stream.readline().decode())
+        except (socket.timeout, OSError, ValueError):
+            self.available = False
+            return None
+        if 'error' in response:
+            self.available = False
+            return None
+        return response['results'], response['duration'], response['timings']
+
+
+class LintDaemonWorker:
+    """State of a lint daemon process kept in line with the clients it lints for.
+
+    astroid modules and warm linters are dropped when the working directory or
+    ``sys.path`` of the client differs from the previous one, when a file of an
+    astroid module changes or when a pylintrc changes. The modules of the files
+    in the client rootdir are built again once per session, so the result of a
+    request is the same as linting in the client process.
+    """
+
+    def __init__(self):
+        self.environment = None
+        self.session = None
+        self.signatures = {}
+        self.pylintrc_digests = {}
+
+    def handle(self, request):
+        """Lint the files of the request, returns the response"""
+        import pylint_engine  # pylint: disable=import-outside-toplevel
+        versions = pylint_engine.lint_versions()
+        if request['versions'] != versions:
+            return {'error': 'daemon runs {0}, the client {1}'.format(versions, request['versions'])}
+        environment = [request['cwd'], request['sys_path']]
+        if environment != self.environment:
+            self.environment = environment
+            self.session = None
+            self._clear()
+        os.chdir(request['cwd'])
+        sys.path[:] = request['sys_path']
+        if request['session'] != self.session:
+            self.session = request['session']
+            self._drop_changed_modules(request['root'])
+        pylintrc_file = request['pylintrc_file']
+        if pylintrc_file:
+            with open(pylintrc_file, 'rb') as pylintrc:
+                digest = hashlib.sha1(pylintrc.read()).hexdigest()
+            if self.pylintrc_digests.setdefault(pylintrc_file, digest) != digest:
+                self.pylintrc_digests[pylintrc_file] = digest
+                pylint_engine.clear_warm_linters()
+        try:
+            results, duration, timings = pylint_engine.lint_files(
+                request['paths'], pylintrc_file, request['timings'], **request['reporter_options'])
+        finally:
+            self._record_signatures(request['root'])
+        return {'results': results, 'duration': duration, 'timings': timings}
+
+    def _clear(self):
+        import astroid  # pylint: disable=import-outside-toplevel
+        import pylint_engine  # pylint: disable=import-outside-toplevel
+        astroid.MANAGER.clear_cache()
+        pylint_engine.clear_warm_linters()
+        self.signatures = {}
+
+    def _drop_changed_modules(self, root):
+        """Drop modules of the files in ``root``, everything if any other module file changed"""
+        import astroid  # pylint: disable=import-outside-toplevel
+        for modname, path in self._module_files():
+            if path.startswith(join(root, '')):
+                del astroid.MANAGER.astroid_cache[modname]
+            elif path not in self.signatures or self.signatures[path] != _file_signature(path):
+                # Modules inferred from the changed one could be outdated too
+                self._clear()
+                return
+
+    def _record_signatures(self, root):
+        """Remember the signatures of the files of modules outside ``root`` built by the request"""
+        for _, path in self._module_files():
+            if not path.startswith(join(root, '')) and path not in self.signatures:
+                self.signatures[path] = _file_signature(path)
+
+    @staticmethod
+    def _module_files():
+        """``(name, file)`` pairs of the astroid modules built from files"""
+        import astroid  # pylint: disable=import-outside-toplevel
+        return [
+            (modname, module.file) for modname, module in list(astroid.MANAGER.astroid_cache.items())
+            if getattr(module, 'file', None)
+        ]
+
+
+def _file_signature(path):
+    """Modification time and size of the file, None if it is missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def serve_connections(server):
+    """Lint requests accepted by one process of the daemon, one at a time"""
+    worker = LintDaemonWorker()
+    while True:
+        connection, _ = server.accept()
+        with connection, connection.makefile('rwb') as stream:
+            try:
+                response = worker.handle(json.loads(stream.readline().decode()))
+            except Exception as error:  # pylint: disable=broad-except
+                response = {'error': '{0}: {1}'.format(type(error).__name__, error)}
+            try:
+                stream.write(json.dumps(response).encode() + b'\n')
+                stream.flush()
+            except OSError:
+                pass
+
+
+def serve(socket_path, processes=None):
+    """Serve lint requests on the Unix socket by ``processes`` warm processes until terminated"""
+    if exists(socket_path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(socket_path)
+            except OSError:
+                # Left by a daemon which did not stop cleanly
+                os.remove(socket_path)
+            else:
+                raise RuntimeError('lint daemon is already listening on {0}'.format(socket_path))
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(128)
+    context = multiprocessing.get_context('fork')
+    children = [
+        context.Process(target=serve_connections, args=(server,), daemon=True)
+        for _ in range(processes or os.cpu_count() or 1)
+    ]
+    try:
+        for child in children:
+            child.start()
+        for child in children:
+            child.join()
+    finally:
+        for child in children:
+            if child.pid is not None:
+                child.terminate()
+        server.close()
+        if exists(socket_path):
+            os.remove(socket_path)
+
+
+def main(argv=None):
+    """Run the lint daemon"""
+    parser = argparse.ArgumentParser(description='Lint daemon keeping warm linters for --pylint-daemon')
+    parser.add_argument('--socket', required=True, help='path of the Unix socket to listen on')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='number of linting processes (default: number of CPUs)')
+    args = parser.parse_args(argv)
+    try:
+        serve(args.socket, args.processes)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
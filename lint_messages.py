@@ -0,0 +1,17 @@
+"""Pylint message fields and categories of the plugin and of the pylint engine.
+
+The plugin imports this module without importing pylint, the engine imports it too.
+"""
+
+
+# Fields of ``pylint.message.Message`` recorded by default, a ``msg-template`` may refer to the other fields
+# of the installed pylint too (``end_line`` and ``end_column`` of pylint 2.12 and later)
+MESSAGE_FIELDS = ('msg_id', 'symbol', 'msg', 'C', 'category', 'confidence',
+                  'abspath', 'path', 'module', 'obj', 'line', 'column')
+# Pylint message categories from the least severe, ``--pylint-fail-fast`` threshold
+MESSAGE_CATEGORIES = ('info', 'convention', 'refactor', 'warning', 'error', 'fatal')
+
+
+def category_severity(category):
+    """Severity of pylint message category, ``any`` is the least one"""
+    return MESSAGE_CATEGORIES.index(category) if category in MESSAGE_CATEGORIES else 0
@@ -0,0 +1,268 @@
+"""Pylint engine of the plugin: warm linters of the process and the reporter of message records.
+
+Importing pylint and astroid takes more than the rest of pytest startup, so the plugin
+imports this module only when linting is enabled and pytest runs without it never load them.
+"""
+import functools
+import os
+import sys
+import time
+
+import astroid
+import pylint
+from pylint import lint
+from pylint.interfaces import IReporter
+from pylint.reporters import BaseReporter
+
+from lint_messages import MESSAGE_FIELDS, category_severity
+
+
+# Checkers of the first --pylint-tiers pass, they work on syntax tree and scopes without inference.
+# The other checkers, including the ones of pylint plugins, run in the second pass.
+TIER1_CHECKERS = frozenset(('basic', 'design', 'format', 'miscellaneous', 'spelling', 'variables'))
+# Checker methods called by the linter, their time is added to the checker name
+TIMED_CHECKER_METHODS = ('open', 'close', 'process_module', 'process_tokens')
+# Messages comparing the checked files, added by checkers ``close`` after the check of the last file.
+# A check of several files would report them for that file, so only single file checks run them.
+CROSS_FILE_MESSAGES = frozenset(('R0801', 'duplicate-code', 'R0401', 'cyclic-import'))
+CROSS_FILE_CHECKERS = frozenset(('similarities',))
+
+# Configured linters of the current process (xdist worker or main one) by their ``lint.Run`` options
+_WARM_LINTERS = {}
+
+
+class LintAborted(BaseException):
+    """Raised by the reporter to stop linting the file on ``--pylint-fail-fast`` message.
+
+    It is not an ``Exception``, so no pylint or astroid handler of errors swallows it.
+    """
+
+    def __init__(self, path):
+        super(LintAborted, self).__init__(path)
+        self.path = path
+
+
+class ProgrammaticReporter(BaseReporter):  # pylint: disable=too-many-instance-attributes
+    """Reporter that replaces output with storage of compact message records by file.
+
+    A record is a tuple of the message ``fields`` values only. Messages of a file
+    over ``max_messages`` (if not 0) are only counted in ``omitted``. A message of
+    ``fail_fast`` or more severe category aborts the check of the file.
+    """
+
+    __implements__ = IReporter
+    name = 'pylint-vcs-reporter'
+    extension = 'prog'
+    # Set by ``warm_linter``, the linter is configured without checking any file
+    configure_only = False
+
+    def __init__(self, output=None, fields=MESSAGE_FIELDS, max_messages=0, fail_fast=None, tier=0):
+        BaseReporter.__init__(self, output)
+        # --pylint-tiers pass the checkers of ``PluginLinter`` are limited to, 0 runs all of them
+        self.tier = tier
+        self.fields = fields
+        self.max_messages = max_messages
+        self.fail_fast = None if fail_fast is None else category_severity(fail_fast)
+        self.path_data = {}
+        self.omitted = {}
+        self.aborted = set()
+        # Seconds spent by pylint checkers by their name, collected by ``PluginLinter`` when set
+        self.timings = None
+        self._current_path = None
+
+    def handle_message(self, msg):
+        """Store the message record of the current file"""
+        records = self.path_data.setdefault(self._current_path, [])
+        if self.max_messages and len(records) >= self.max_messages:
+            self.omitted[self._current_path] = self.omitted.get(self._current_path, 0) + 1
+        else:
+            records.append(message_record(msg, self.fields))
+        if self.fail_fast is not None and category_severity(msg.category) >= self.fail_fast:
+            self.aborted.add(self._current_path)
+            raise LintAborted(self._current_path)
+
+    def on_set_current_module(self, module, filepath):
+        """Remember linted file path to group its messages"""
+        self._current_path = filepath
+
+    def _display(self, layout):
+        """launch layouts display"""
+
+
+def message_record(msg, fields=MESSAGE_FIELDS):
+    """Convert pylint message into JSON serializable tuple of ``fields`` values.
+
+    Fields the installed pylint message does not have are None, as ``end_line``
+    and ``end_column`` before pylint 2.12.
+    """
+    return tuple(
+        getattr(msg.confidence, 'name', msg.confidence) if field == 'confidence' else getattr(msg, field, None)
+        for field in fields
+    )
+
+
+class PluginLinter(lint.PyLinter):  # pylint: disable=too-many-ancestors
+    """Linter running the checkers of the reporter ``tier`` and timing them if the reporter has ``timings``.
+
+    The checkers of a tier are selected and their methods are wrapped to add their time
+    when the linter prepares them for a check, the time of building astroid modules is
+    added under the ``astroid`` name. A check of several files skips ``CROSS_FILE_MESSAGES``,
+    so the result of every file does not depend on the files checked with it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(PluginLinter, self).__init__(*args, **kwargs)
+        self._timed_call = False
+        self._single_file = True
+
+    @property
+    def timings(self):
+        """Dictionary to add checkers time to or None if time is not measured"""
+        return getattr(self.reporter, 'timings', None)
+
+    def prepare_checkers(self):
+        checkers = super(PluginLinter, self).prepare_checkers()
+        tier = getattr(self.reporter, 'tier', 0)
+        if tier:
+            checkers = [
+                checker for checker in checkers
+                if checker is self or (checker.name in TIER1_CHECKERS) == (tier == 1)
+            ]
+        if not self._single_file:
+            checkers = [checker for checker in checkers if checker.name not in CROSS_FILE_CHECKERS]
+        if self.timings is not None:
+            for checker in checkers:
+                if checker is not self:
+                    self._wrap_checker(checker)
+        return checkers
+
+    def check(self, files_or_modules):
+        if not getattr(self.reporter, 'configure_only', False):
+            self._single_file = isinstance(files_or_modules, str) or len(files_or_modules) == 1
+            super(PluginLinter, self).check(files_or_modules)
+
+    def is_message_enabled(self, msg_descr, line=None, confidence=None):
+        if not self._single_file and msg_descr in CROSS_FILE_MESSAGES:
+            return False
+        return super(PluginLinter, self).is_message_enabled(msg_descr, line, confidence)
+
+    def get_ast(self, filepath, modname, data=None):
+        # pylint 2.9 and later pass the source ``data`` too
+        args = (filepath, modname) if data is None else (filepath, modname, data)
+        return self._timed('astroid', super(PluginLinter, self).get_ast)(*args)
+
+    def _wrap_checker(self, checker):
+        for member in dir(checker):
+            if member.startswith(('visit_', 'leave_')) or member in TIMED_CHECKER_METHODS:
+                method = getattr(checker, member)
+                if callable(method) and not getattr(method, 'pylint_timed', False):
+                    setattr(checker, member, self._timed(checker.name, method))
+
+    def _timed(self, name, method):
+        """Wrap the method to add its time to ``name``, nested calls are counted once"""
+        @functools.wraps(method)
+        def timed(*args):
+            timings = self.timings
+            if timings is None or self._timed_call:
+                return method(*args)
+            self._timed_call = True
+            start = time.perf_counter()
+            try:
+                return method(*args)
+            finally:
+                self._timed_call = False
+                elapsed = time.perf_counter() - start
+                # pylint infers None of the property, the check above does not narrow it
+                timings[name] = timings.get(name, 0.0) + elapsed  # pylint: disable=unsupported-assignment-operation
+        timed.pylint_timed = True
+        return timed
+
+
+class LintRun(lint.Run):
+    """Pylint run configuring ``PluginLinter``"""
+
+    LinterClass = PluginLinter
+
+
+def run_pylint(paths, reporter, pylintrc_file=None):
+    """Lint ``paths`` reporting messages to ``reporter`` with the warm linter of current process.
+
+    The first call for a configuration goes through ``LintRun`` which reads the rcfile,
+    loads plugins and registers checkers. The configured ``PyLinter`` is kept, so the
+    next calls only switch the reporter and check files, reusing astroid module cache.
+    """
+    options = _run_options(pylintrc_file)
+    linter = _WARM_LINTERS.get(tuple(options))
+    if linter is None:
+        try:
+            LintRun(list(paths) + options, reporter=reporter, do_exit=False)
+        finally:
+            # The linter is set to the reporter before the check, which the reporter may abort
+            if getattr(reporter, 'linter', None) is not None:
+                _WARM_LINTERS[tuple(options)] = reporter.linter
+    else:
+        linter.set_reporter(reporter)
+        with lint.fix_import_path(paths):
+            linter.check(paths)
+    return reporter.path_data
+
+
+def lint_files(paths, pylintrc_file=None, timings=False, **reporter_options):
+    """Lint ``paths`` with the warm linter of the process, ``--pylint-jobs`` pool calls it too.
+
+    Returns a tuple of lint results by path (every path is present), the time of the
+    check and the time of pylint checkers if ``timings`` are requested. A result is
+    a dictionary of ``messages`` records, the count of ``omitted`` messages and the
+    ``aborted`` flag of ``ProgrammaticReporter`` created with ``reporter_options``.
+    """
+    reporter = ProgrammaticReporter(**reporter_options)
+    reporter.timings = {} if timings else None
+    start = time.perf_counter()
+    remaining = list(paths)
+    while remaining:
+        try:
+            run_pylint(remaining, reporter, pylintrc_file)
+            remaining = []
+        except LintAborted as aborted:
+            # The files after the aborted one are checked by the next run
+            remaining = remaining[remaining.index(aborted.path) + 1:] if aborted.path in remaining else []
+    duration = time.perf_counter() - start
+    results = {path: {'messages': [], 'omitted': 0, 'aborted': False} for path in paths}
+    for path, records in reporter.path_data.items():
+        result = results.setdefault(path, {'messages': [], 'omitted': 0, 'aborted': False})
+        result['messages'].extend(records)
+        result['omitted'] += reporter.omitted.get(path, 0)
+        result['aborted'] = path in reporter.aborted
+    return results, duration, reporter.timings
+
+
+def warm_linter(pylintrc_file=None):
+    """Configure the warm linter of ``pylintrc_file`` without checking files.
+
+    Children forked for --pylint-timeout and --pylint-max-memory inherit it
+    instead of importing pylint and reading the configuration again.
+    """
+    options = _run_options(pylintrc_file)
+    if tuple(options) not in _WARM_LINTERS:
+        reporter = ProgrammaticReporter()
+        reporter.configure_only = True
+        # ``lint.Run`` exits without a file argument, the configured linter does not check it
+        LintRun([os.curdir] + options, reporter=reporter, do_exit=False)
+        _WARM_LINTERS[tuple(options)] = reporter.linter
+
+
+def clear_warm_linters():
+    """Drop the warm linters of the process, the next ``run_pylint`` configures them again"""
+    _WARM_LINTERS.clear()
+
+
+def _run_options(pylintrc_file):
+    options = ['--persistent=n']
+    if pylintrc_file:
+        options.append('--rcfile={0}'.format(pylintrc_file))
+    return options
+
+
+def lint_versions():
+    """Versions of python, pylint and astroid, the daemon lints only for clients of the same ones"""
+    return [sys.version, pylint.__version__, astroid.__version__]
@@ -1,48 +1,1262 @@
 """Pylint plugin for py.test"""
+# pylint: disable=too-many-lines
+import ast
+import hashlib
+import importlib
+import itertools
+import json
+import multiprocessing
+import os
 from os import sep
 from os.path import dirname
 from os.path import exists
 from os.path import join
 import re
+import resource
+import shutil
+import signal
+import socket
+import string
+import tempfile
+import time
+import traceback
+import uuid
 
 from six.moves.configparser import (  # pylint: disable=import-error
     ConfigParser,
     NoSectionError,
     NoOptionError
 )
-from pylint import lint
-from pylint.config import PYLINTRC
-from pylint.interfaces import IReporter
-from pylint.reporters import BaseReporter
+import py
 import pytest
+try:
+    from xdist.scheduler import LoadScopeScheduling
+except ImportError:  # pytest-xdist is optional, the scheduler is used only by its hook
+    LoadScopeScheduling = object
+try:
+    import inotify_simple
+except ImportError:  # inotify_simple is optional, --pylint-watch polls the files without it
+    inotify_simple = None
 
-import svn
+from lint_messages import MESSAGE_CATEGORIES, MESSAGE_FIELDS
 
 
-SCM_LIST = [svn]
+# VCS modules in the order of detection, imported only in VCS mode
+SCM_LIST = ['svn', 'git']
 
+PYLINT_NODEID_SUFFIX = '[pylint]'
+# Node id suffixes of pylint items: ``[pylint]`` or ``[pylint-tier1]`` and ``[pylint-tier2]`` with --pylint-tiers,
+# ``[pylint-package]`` or ``[pylint-chunk-N]`` of a directory with --pylint-granularity
+PYLINT_NODEID_RE = re.compile(r'\[pylint(?:-tier[12]|-package|-chunk-\d+)?\]$')
+PYLINT_GROUP_NODEID_RE = re.compile(r'\[pylint-(?:package|chunk-\d+)\]$')
+
+DEFAULT_MSG_FORMAT = '{C}:{line:3d},{column:2d}: {msg} ({symbol})'
+# Fields of the messages written to --pylint-report, message records keep them besides the format ones
+REPORT_FIELDS = ('msg_id', 'symbol', 'msg', 'category', 'line', 'column')
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+# SARIF result level by pylint message category, the other categories are notes
+SARIF_LEVELS = {'fatal': 'error', 'error': 'error', 'warning': 'warning'}
+DEFAULT_CACHE_SIZE = 20000
+# Version of lint results layout, part of every cache key
+RESULT_FORMAT = '5'
+DEFAULT_SHARED_STORE_SIZE = 1024
+# Seconds between evictions of --pylint-shared-store by any of the machines sharing it
+SHARED_STORE_EVICTION_INTERVAL = 3600
+# Seconds --pylint-watch waits for the other inotify events of a saved file
+WATCH_READ_DELAY = 0.1
+# pytest cache key of lint durations by pylint item nodeid
+DURATIONS_CACHE_KEY = 'pylint/durations'
+# pytest cache directory of --pylint-duplicates index
+DUPLICATES_CACHE_DIR = 'pylint-duplicates'
+# Characters of the window hash naming the bucket of --pylint-duplicates index listing the files having the window
+DUPLICATES_BUCKET_CHARS = 4
+DUPLICATES_NODEID_SUFFIX = '[pylint-duplicates]'
+TIMINGS_SUMMARY_SIZE = 20
+# Names of -m mark expression checked for selecting only lint items, the other expressions collect everything
+MARKEXPR_MAX_NAMES = 8
 
 class PyLintException(Exception):
     """Exception to raise if a file has a specified pylint error"""
 
 
-class ProgrammaticReporter(BaseReporter):
-    """Reporter that replaces output with storage in list of dictionaries"""
+def message_fields(msg_format, extra=()):
+    """Message fields the message format refers to and the ``extra`` ones, ``MESSAGE_FIELDS`` first"""
+    names = {
+        re.split(r'[.\[]', field_name, 1)[0]
+        for _, field_name, _, _ in string.Formatter().parse(msg_format) if field_name
+    }
+    names.update(extra)
+    return tuple(field for field in MESSAGE_FIELDS if field in names) + tuple(
+        sorted(name for name in names if name not in MESSAGE_FIELDS))
+
+
+class LintResultCache:
+    """Persistent storage of pylint messages keyed by the content of the linted file.
+
+    Every entry is a JSON file named after the hash of the file path, the file
+    content, the paths and contents of the project modules the file imports
+    (``imported_files``), the resolved pylintrc contents, the python, pylint and
+    astroid versions, the fields of message records and the ``variant`` of stored
+    results (the messages limit), so an entry never has to be invalidated: any
+    change produces a new key.
+    Entries modification time is bumped on every hit and the least recently used
+    entries are evicted when the number of entries exceeds ``max_entries``.
+    """
+
+    def __init__(self, directory, max_entries=DEFAULT_CACHE_SIZE, variant=''):
+        self.directory = str(directory)
+        self.max_entries = max_entries
+        self.variant = variant
+        self._config_hashes = {}
+
+    def config_hash(self, pylintrc_file):
+        """Hash of everything besides the linted file that affects pylint messages"""
+        if pylintrc_file not in self._config_hashes:
+            digest = hashlib.sha1()
+            import pylint_engine  # pylint: disable=import-outside-toplevel
+            for version in pylint_engine.lint_versions() + [RESULT_FORMAT, self.variant]:
+                digest.update(version.encode())
+                digest.update(b'\0')
+            if pylintrc_file:
+                with open(pylintrc_file, 'rb') as pylintrc:
+                    digest.update(pylintrc.read())
+            self._config_hashes[pylintrc_file] = digest.hexdigest()
+        return self._config_hashes[pylintrc_file]
+
+    def key(self, path, pylintrc_file=None, tier=0, fields=MESSAGE_FIELDS):
+        """Cache key of the ``path`` file linted with ``pylintrc_file`` config by checkers of ``tier``"""
+        digest = self._digest(pylintrc_file, tier, fields)
+        for key_path in [path] + imported_files(path):
+            digest.update(self._key_name(key_path).encode())
+            digest.update(b'\0')
+            try:
+                with open(key_path, 'rb') as key_file:
+                    digest.update(hashlib.sha1(key_file.read()).digest())
+            except OSError:
+                if key_path == path:
+                    raise
+        return digest.hexdigest()
+
+    @staticmethod
+    def _key_name(path):
+        """Name of the file in the key"""
+        return path
+
+    def _digest(self, pylintrc_file, tier, fields):
+        """Hash of the key parts besides the linted file, message records keep only the ``fields``"""
+        digest = hashlib.sha1(self.config_hash(pylintrc_file).encode())
+        if tier:
+            digest.update('tier{0}'.format(tier).encode())
+        digest.update(','.join(fields).encode())
+        digest.update(b'\0')
+        return digest
+
+    def _entry_path(self, key):
+        return join(self.directory, key + '.json')
+
+    def __contains__(self, key):
+        return exists(self._entry_path(key))
+
+    def get(self, key):
+        """Returns stored messages list or None if there is no entry for the key"""
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path) as entry:
+                messages = json.load(entry)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(entry_path, None)
+        except OSError:
+            # The entry is still valid, only its eviction order is not updated (read-only or foreign entry)
+            pass
+        return messages
+
+    def put(self, key, messages):
+        """Store messages atomically so concurrent xdist workers never read partial entry"""
+        _write_json(self._entry_path(key), messages)
+
+    def evict(self):
+        """Remove least recently used entries exceeding ``max_entries``"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json'):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    pass
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        for _, entry_path in entries[:len(entries) - self.max_entries]:
+            _remove(entry_path)
+
+
+class SharedResultStore(LintResultCache):
+    """Lint results shared by machines linting the same files, in a directory on a shared mount.
+
+    Entries are keyed by the path relative to ``root`` instead of the absolute one,
+    so checkouts in different directories share them, and spread over subdirectories
+    by the first two characters of the key. Writers rename complete entries into
+    place, so concurrent writers of one entry on several machines leave one of the
+    equal results and readers never see a partial one. The least recently used
+    entries are evicted when their total size exceeds ``max_bytes``, at most once
+    per ``SHARED_STORE_EVICTION_INTERVAL`` by any of the machines.
+    """
+
+    def __init__(self, directory, root, max_bytes=DEFAULT_SHARED_STORE_SIZE * 1024 * 1024, variant=''):
+        super(SharedResultStore, self).__init__(directory, variant=variant)
+        self.root = str(root)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _key_name(self, path):
+        """Path relative to the root, the key is the same in every checkout of the files"""
+        return os.path.relpath(path, self.root).replace(sep, '/')
+
+    def _entry_path(self, key):
+        return join(self.directory, key[:2], key + '.json')
+
+    def put(self, key, messages):
+        """Store messages atomically, the entry name is unique to the writing machine until renamed"""
+        os.makedirs(dirname(self._entry_path(key)), exist_ok=True)
+        super(SharedResultStore, self).put(key, messages)
+
+    def evict(self):
+        """Remove least recently used entries exceeding ``max_bytes`` and entries left by crashed writers"""
+        marker = join(self.directory, '.evicted')
+        try:
+            if time.time() - os.stat(marker).st_mtime < SHARED_STORE_EVICTION_INTERVAL:
+                return
+        except OSError:
+            pass
+        try:
+            # Other machines skip the eviction from now on, even if this one is interrupted
+            with open(marker, 'w') as marker_file:
+                marker_file.write(socket.gethostname())
+        except OSError:
+            return
+        entries = []
+        size = 0
+        for subdirectory in os.scandir(self.directory):
+            if not subdirectory.is_dir():
+                continue
+            for entry in os.scandir(subdirectory.path):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if entry.name.endswith('.tmp'):
+                    if time.time() - stat.st_mtime > SHARED_STORE_EVICTION_INTERVAL:
+                        _remove(entry.path)
+                elif entry.name.endswith('.json'):
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    size += stat.st_size
+        entries.sort()
+        for _, entry_size, entry_path in entries:
+            if size <= self.max_bytes:
+                break
+            _remove(entry_path)
+            size -= entry_size
+
+
+def _write_json(path, value):
+    """Write the JSON file atomically, readers never see a partial file"""
+    file_descriptor, tmp_path = tempfile.mkstemp(dir=dirname(path), suffix='.tmp')
+    try:
+        # mkstemp creates the file readable by its owner only, the entries are readable as other files
+        os.fchmod(file_descriptor, 0o666 & ~_umask())
+        with os.fdopen(file_descriptor, 'w') as stored:
+            json.dump(value, stored)
+        os.replace(tmp_path, path)
+    except OSError:
+        if exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _umask():
+    """The file mode creation mask of the process"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+def _remove(path):
+    """Remove the file unless it is already removed, by another machine sharing it too"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def result_stores(session, path, pylintrc_file, fields, tier=0):
+    """``(store, key)`` pairs of the results cache and the shared store of the session keeping result of the file"""
+    stores = [getattr(session, 'pylint_cache', None)]
+    # Absolute paths of messages differ in every checkout
+    if 'abspath' not in fields:
+        stores.append(getattr(session, 'pylint_shared_store', None))
+    pylintrc_file = pylintrc_file or session.pylintrc_file
+    return [(store, store.key(path, pylintrc_file, tier, fields)) for store in stores if store is not None]
+
+
+def stored_result(stores):
+    """Returns the result from the first of ``result_stores`` having it, copied to the ones before"""
+    for position, (store, key) in enumerate(stores):
+        result = store.get(key)
+        if result is not None:
+            for previous_store, previous_key in stores[:position]:
+                previous_store.put(previous_key, result)
+            return result
+    return None
+
+
+def store_result(stores, result):
+    """Publish the result to all ``result_stores``"""
+    if result.get('limit'):
+        # The limits could be breached only on a busy machine
+        return
+    for store, key in stores:
+        store.put(key, result)
+
+
+def lint_item_files(item, paths, timings=False, **reporter_options):
+    """Lint ``paths`` for the item by --pylint-daemon when it is reachable, in the process otherwise"""
+    option = item.config.option
+    if option.pylint_timeout or option.pylint_max_memory:
+        return lint_files_limited(
+            paths, item.pylintrc_file, timings, option.pylint_timeout, option.pylint_max_memory, reporter_options)
+    daemon = getattr(item.session, 'pylint_daemon', None)
+    if daemon is not None:
+        lint_result = daemon.lint(paths, item.pylintrc_file, timings, reporter_options)
+        if lint_result is not None:
+            return lint_result
+    import pylint_engine  # pylint: disable=import-outside-toplevel
+    return pylint_engine.lint_files(paths, item.pylintrc_file, timings, **reporter_options)
+
+
+def lint_files_limited(paths, pylintrc_file, timings, timeout, max_memory, reporter_options):
+    """``pylint_engine.lint_files`` in a supervised child process limited in time and memory.
+
+    The child forked from the warm process gets ``timeout`` seconds per file and may
+    allocate ``max_memory`` megabytes. When a batch breaches a limit, its files are
+    linted one by one, so only the result of the breaching file reports the limit
+    instead of its messages.
+    """
+    import pylint_engine  # pylint: disable=import-outside-toplevel
+    # Configured before the fork, so no child imports pylint or reads the configuration
+    pylint_engine.warm_linter(pylintrc_file)
+    args = (paths, pylintrc_file, timings)
+    lint_result, breach = _LIMITED_LINT_CHILD.lint(
+        args, reporter_options, timeout and timeout * len(paths), max_memory)
+    if lint_result is not None:
+        return lint_result
+    if len(paths) == 1:
+        limit = ('linting exceeded --pylint-timeout={0} seconds'.format(timeout) if breach == 'timeout' else
+                 'linting exceeded --pylint-max-memory={0} MB'.format(max_memory))
+        result = {'messages': [], 'omitted': 0, 'aborted': False, 'limit': limit}
+        return {paths[0]: result}, timeout or 0.0, {} if timings else None
+    results, duration, all_timings = {}, 0.0, {} if timings else None
+    for path in paths:
+        path_results, path_duration, path_timings = lint_files_limited(
+            [path], pylintrc_file, timings, timeout, max_memory, reporter_options)
+        results.update(path_results)
+        duration += path_duration
+        for name, seconds in (path_timings or {}).items():
+            all_timings[name] = all_timings.get(name, 0.0) + seconds
+    return results, duration, all_timings
+
+
+class LimitedLintChild:
+    """Child process forked from the warm process linting the files of its requests in turn.
+
+    The child keeps the astroid modules it builds for the next requests. It is killed
+    when a request breaches the timeout and exits after running out of memory or an
+    error, the next request forks a new one. The child is forked directly, the daemonic
+    processes of ``--pylint-jobs`` pool can not start ``multiprocessing`` ones.
+    """
+
+    def __init__(self):
+        self.pid = None
+        self.owner = None
+        self.connection = None
+
+    def lint(self, args, kwargs, timeout, max_memory):
+        """Returns ``pylint_engine.lint_files`` result of the child or None and the breached limit, timeout or memory.
 
-    __implements__ = IReporter
-    name = 'pylint-vcs-reporter'
-    extension = 'prog'
+        An error of the child is raised again in the parent.
+        """
+        if self.pid is not None and self.owner != os.getpid():
+            # Inherited by a forked process, the child belongs to the parent of the process
+            self.connection.close()
+            self.pid = None
+        if self.pid is None:
+            self._start()
+        self.connection.send((args, kwargs, max_memory))
+        if not self.connection.poll(timeout or None):
+            self.stop(kill=True)
+            return None, 'timeout'
+        try:
+            kind, value = self.connection.recv()
+        except EOFError:
+            kind, value = None, None
+        if kind == 'result':
+            return value, None
+        status = self.stop()
+        # Killed without a result, by the OOM killer most likely
+        if max_memory and (kind == 'memory' or kind is None and os.WIFSIGNALED(status)):
+            return None, 'memory'
+        if kind is None:
+            raise PyLintException('linting child process exited with status {0} without a result'.format(status))
+        raise PyLintException('linting in a child process failed:\n{0}'.format(value))
 
-    def __init__(self, output=None):
-        BaseReporter.__init__(self, output)
-        self.data = []
+    def stop(self, kill=False):
+        """Stop the child of the process, it exits when the connection closes. Returns its exit status"""
+        if self.pid is None or self.owner != os.getpid():
+            return None
+        if kill:
+            os.kill(self.pid, signal.SIGKILL)
+        self.connection.close()
+        _, status = os.waitpid(self.pid, 0)
+        self.pid = None
+        return status
 
-    def handle_message(self, msg):
-        """Get message and append to our data structure"""
-        self.data.append(msg)
+    def _start(self):
+        connection, child_connection = multiprocessing.Pipe()
+        pid = os.fork()
+        if pid == 0:
+            connection.close()
+            try:
+                _serve_limited_lint(child_connection)
+            finally:
+                os._exit(0)
+        child_connection.close()
+        self.pid, self.owner, self.connection = pid, os.getpid(), connection
+
+
+def _serve_limited_lint(connection):
+    """Lint the requests in the child, the address space of every one limited to ``max_memory`` megabytes more"""
+    import pylint_engine  # pylint: disable=import-outside-toplevel
+    while True:
+        try:
+            args, kwargs, max_memory = connection.recv()
+        except EOFError:
+            return
+        try:
+            if max_memory:
+                _limit_address_space(max_memory)
+            message = ('result', pylint_engine.lint_files(*args, **kwargs))
+        except MemoryError:
+            message = ('memory', traceback.format_exc())
+        except Exception:  # pylint: disable=broad-except
+            message = ('error', traceback.format_exc())
+        connection.send(message)
+        if message[0] != 'result':
+            return
+
+
+def _limit_address_space(max_memory):
+    """Limit the address space of the process to ``max_memory`` megabytes more than it uses.
+
+    An unprivileged process can not raise its hard limit, so the hard limit is kept and
+    the soft one does not exceed it.
+    """
+    with open('/proc/self/statm') as statm:
+        address_space = int(statm.read().split()[0]) * resource.getpagesize()
+    hard_limit = resource.getrlimit(resource.RLIMIT_AS)[1]
+    soft_limit = address_space + max_memory * 1024 * 1024
+    if hard_limit != resource.RLIM_INFINITY:
+        soft_limit = min(soft_limit, hard_limit)
+    resource.setrlimit(resource.RLIMIT_AS, (soft_limit, hard_limit))
+
+
+# Supervised child of the process linting with --pylint-timeout or --pylint-max-memory
+_LIMITED_LINT_CHILD = LimitedLintChild()
+
+
+def format_lint_result(result, msg_format, fields, option):
+    """Text of the lint result reported by the item, empty if the file passed"""
+    text = '\n'.join(msg_format.format(**dict(zip(fields, record))) for record in result['messages'])
+    if result['omitted']:
+        text += '\n... {0} more messages not reported (--pylint-max-messages={1})'.format(
+            result['omitted'], option.pylint_max_messages)
+    if result['aborted']:
+        category = option.pylint_fail_fast
+        text += '\n... linting stopped at the first {0}message (--pylint-fail-fast)'.format(
+            '' if category == 'any' else category + ' ')
+    if result.get('limit'):
+        text = (text + '\n' if text else '') + result['limit']
+    return text
+
+
+def report_fields(config):
+    """Fields message records keep for --pylint-report besides the ones of the format"""
+    return REPORT_FIELDS if config.option.pylint_report else ()
+
+
+def report_messages(result, fields, rel_path):
+    """Messages of the lint result of ``rel_path`` file as dictionaries of ``REPORT_FIELDS`` and the path"""
+    positions = [fields.index(field) for field in REPORT_FIELDS]
+    path = rel_path.replace(sep, '/')
+    return [
+        dict(zip(REPORT_FIELDS, (record[position] for position in positions)), path=path)
+        for record in result['messages']
+    ]
+
+
+def submit_lint(pool, paths, item):
+    """Start linting ``paths`` for the item in ``--pylint-jobs`` pool, returns the pending ``lint_files`` result"""
+    import pylint_engine  # pylint: disable=import-outside-toplevel
+    option = item.config.option
+    if option.pylint_timeout or option.pylint_max_memory:
+        return pool.apply_async(lint_files_limited, (
+            paths, item.pylintrc_file, option.pylint_timings, option.pylint_timeout,
+            option.pylint_max_memory, item.reporter_options))
+    return pool.apply_async(
+        pylint_engine.lint_files, (paths, item.pylintrc_file, option.pylint_timings), item.reporter_options)
+
+
+class LintBatch:
+    """Pylint items linted together with single pylint check.
+
+    Shared imports of the batch files are inferred by astroid only once. The
+    messages are split by file, so every item still passes or fails on its own.
+    The batch is either linted by the first item which runs or submitted to
+    ``--pylint-jobs`` pool right after collection.
+    """
+
+    def __init__(self, items):
+        self.items = items
+        self.lint_duration = None
+        self._results = {}
+        self._linted = False
+        self._pending = None
+
+    def paths_to_lint(self, item=None):
+        """Paths of the batch files without stored result and of the ``item`` file"""
+        return [
+            batch_item.fspath.strpath for batch_item in self.items
+            if batch_item is item or not (batch_item.result_stored() or batch_item.tier1_failed(lint=False))
+        ]
+
+    def submit(self, pool):
+        """Start linting the batch files without cached result in the pool"""
+        paths = self.paths_to_lint()
+        if paths:
+            self._pending = submit_lint(pool, paths, self.items[0])
+
+    def result(self, item):
+        """Returns lint result of the item, the first call lints or waits for all batch files"""
+        path = item.fspath.strpath
+        if self._pending is not None:
+            self._add_results(self._pending.get(), item)
+            self._pending = None
+        if path not in self._results:
+            # The files with cached result are skipped, so the result of the item could be lost meanwhile
+            paths = [path] if self._linted else self.paths_to_lint(item)
+            self._add_results(lint_item_files(
+                item, paths, item.lint_timings is not None, **item.reporter_options), item)
+        return self._results.pop(path)
+
+    def _add_results(self, lint_result, item):
+        results, duration, timings = lint_result
+        self._results.update(results)
+        self._linted = True
+        # Share of the check time, the files of a batch are not timed one by one
+        self.lint_duration = duration / len(results)
+        # The checkers time of whole check is reported by the item which gets it
+        if item.lint_timings is not None and timings:
+            item.lint_timings.update(timings)
+
+
+def file_windows(path, min_lines=4, ignore_comments=True, ignore_docstrings=True, ignore_imports=False,
+                 ignore_signatures=None):
+    """Returns ``[hash, first line, last line]`` of every window of ``min_lines`` non empty lines of the file.
+
+    The lines are normalized by pylint ``similarities`` checker function, so the windows
+    match the code it would report as duplicated. ``ignore_signatures`` applies to pylint
+    2.10 and later only, None takes the default of the checker.
+    """
+    import astroid  # pylint: disable=import-outside-toplevel
+    from pylint.checkers import similar  # pylint: disable=import-outside-toplevel
+    try:
+        with open(path) as source:
+            lines = source.readlines()
+        if hasattr(similar, 'LineSpecifs'):
+            # pylint 2.10 and later return the code lines only, numbered from 0
+            if ignore_signatures is None:
+                ignore_signatures = dict(similar.SimilarChecker.options)['ignore-signatures']['default']
+            stripped = similar.stripped_lines(  # pylint: disable=too-many-function-args
+                lines, ignore_comments, ignore_docstrings, ignore_imports, ignore_signatures)
+            code = [(line.line_number + 1, line.text) for line in stripped]
+        else:
+            stripped = similar.stripped_lines(  # pylint: disable=no-value-for-parameter
+                lines, ignore_comments, ignore_docstrings, ignore_imports)
+            code = [(line_number, line) for line_number, line in enumerate(stripped, 1) if line]
+    except (OSError, UnicodeDecodeError, astroid.AstroidSyntaxError):
+        return []
+    windows = []
+    for start in range(len(code) - min_lines + 1):
+        window = code[start:start + min_lines]
+        digest = hashlib.sha1('\n'.join(line for _, line in window).encode()).hexdigest()[:16]
+        windows.append([digest, window[0][0], window[-1][0]])
+    return windows
+
+
+class DuplicateIndex:
+    """Index of normalized line windows of linted files finding code duplicated across files.
+
+    The index is kept in a pytest cache directory of the settings: one entry per file, named
+    after the hash of the file path, holds the file modification time and size with the hashes
+    of its windows, and buckets named after the first characters of the window hashes list the
+    files having every window. Only the entries of checked files and of the files sharing
+    windows with them are read, the entries of files changed since are computed again, collected
+    or not (with --pylint-vcs only changed files are). The entry of a removed file is dropped
+    when a checked file shares a window with it.
+    """
+
+    def __init__(self, config, min_lines=4, ignore_comments=True, ignore_docstrings=True, ignore_imports=False,
+                 ignore_signatures=None):
+        self.settings = [min_lines, ignore_comments, ignore_docstrings, ignore_imports, ignore_signatures]
+        self.directory = None
+        if getattr(config, 'cache', None) is not None:
+            self.directory = join(config.cache.makedir(DUPLICATES_CACHE_DIR).strpath,
+                                  hashlib.sha1(json.dumps(self.settings).encode()).hexdigest())
+        # Whether the files of the collected items of the process are indexed
+        self.collected = False
+        self._entries = {}
+        self._buckets = {}
+        self._changed_entries = set()
+        self._changed_buckets = set()
+
+    def _stored_path(self, kind, name):
+        return join(self.directory, kind, name + '.json')
+
+    def _load(self, kind, name):
+        """Returns the stored entry or bucket, None if there is none"""
+        if self.directory is None:
+            return None
+        try:
+            with open(self._stored_path(kind, name)) as stored:
+                return json.load(stored)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _entry_name(path):
+        return hashlib.sha1(path.encode()).hexdigest()
+
+    def entry(self, path):
+        """Returns the entry of the file, computed again if the file changed since it was indexed,
+        None if the file is removed"""
+        if path in self._entries:
+            return self._entries[path]
+        stored = entry = self._load('files', self._entry_name(path))
+        try:
+            stat = os.stat(path)
+        except OSError:
+            entry = None
+        else:
+            if entry is None or entry['mtime'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+                entry = {'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'windows': file_windows(path, *self.settings)}
+        if entry is not stored:
+            self._changed_entries.add(path)
+            self._move(path, stored, entry)
+        self._entries[path] = entry
+        return entry
+
+    def add(self, paths):
+        """Index the files of ``paths`` which are not indexed yet or changed since"""
+        for path in paths:
+            self.entry(path)
+
+    def _bucket(self, digest):
+        """Paths of the indexed files by window hash of the bucket of the ``digest`` window hash"""
+        prefix = digest[:DUPLICATES_BUCKET_CHARS]
+        if prefix not in self._buckets:
+            self._buckets[prefix] = self._load('windows', prefix) or {}
+        return self._buckets[prefix]
+
+    def _move(self, path, old, new):
+        """Move the file in the buckets from the windows of the ``old`` entry to the windows of the ``new`` one"""
+        old_digests = {digest for digest, _, _ in (old or {}).get('windows', ())}
+        new_digests = {digest for digest, _, _ in (new or {}).get('windows', ())}
+        for digest in old_digests - new_digests:
+            bucket = self._bucket(digest)
+            if path in bucket.get(digest, ()):
+                bucket[digest].remove(path)
+                if not bucket[digest]:
+                    del bucket[digest]
+                self._changed_buckets.add(digest[:DUPLICATES_BUCKET_CHARS])
+        for digest in new_digests - old_digests:
+            paths = self._bucket(digest).setdefault(digest, [])
+            if path not in paths:
+                paths.append(path)
+                self._changed_buckets.add(digest[:DUPLICATES_BUCKET_CHARS])
+
+    def duplicates(self, path):
+        """Returns ``(first line, last line, other path, other first line, other last line)`` of
+        every code block of the file duplicated in another indexed file"""
+        entry = self.entry(path)
+        windows = entry['windows'] if entry is not None else []
+        # Window indexes of the other files by window hash, the buckets may list files changed since
+        positions = {}
+        # Matching windows shifted by the same offset in the same file make one block
+        blocks = {}
+        for index, (digest, _, _) in enumerate(windows):
+            for other_path in list(self._bucket(digest).get(digest, ())):
+                if other_path == path:
+                    continue
+                if other_path not in positions:
+                    other = self.entry(other_path)
+                    positions[other_path] = {}
+                    for other_index, (other_digest, _, _) in enumerate(other['windows'] if other else ()):
+                        positions[other_path].setdefault(other_digest, []).append(other_index)
+                for other_index in positions[other_path].get(digest, ()):
+                    blocks.setdefault((other_path, other_index - index), []).append(index)
+        duplicates = []
+        for (other_path, offset), indexes in sorted(blocks.items()):
+            other_windows = self._entries[other_path]['windows']
+            start = indexes[0]
+            for position, index in enumerate(indexes):
+                if position + 1 == len(indexes) or indexes[position + 1] != index + 1:
+                    duplicates.append((
+                        windows[start][1], windows[index][2],
+                        other_path, other_windows[start + offset][1], other_windows[index + offset][2],
+                    ))
+                    if position + 1 < len(indexes):
+                        start = indexes[position + 1]
+        return sorted(duplicates)
+
+    def save(self):
+        """Store the changed entries and buckets, drop the index of other settings"""
+        if self.directory is None:
+            return
+        for kind in ('files', 'windows'):
+            os.makedirs(join(self.directory, kind), exist_ok=True)
+        for path in self._changed_entries:
+            stored_path = self._stored_path('files', self._entry_name(path))
+            if self._entries[path] is None:
+                _remove(stored_path)
+            else:
+                _write_json(stored_path, self._entries[path])
+        for prefix in self._changed_buckets:
+            stored_path = self._stored_path('windows', prefix)
+            if self._buckets[prefix]:
+                _write_json(stored_path, self._buckets[prefix])
+            else:
+                _remove(stored_path)
+        self._changed_entries = set()
+        self._changed_buckets = set()
+        for entry in os.scandir(dirname(self.directory)):
+            if entry.path != self.directory:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+
+class LintDurations:
+    """Lint durations of pylint items kept in pytest cache between runs.
+
+    Registered as a plugin of the controller (or the only process), which gets
+    the reports of all xdist workers. Only files actually linted report their
+    duration, results taken from ``LintResultCache`` keep the recorded one.
+    """
 
-    def _display(self, layout):
-        """launch layouts display"""
+    def __init__(self, config):
+        self.config = config
+        self.previous = config.cache.get(DURATIONS_CACHE_KEY, {})
+        self.durations = dict(self.previous)
+
+    def pytest_runtest_logreport(self, report):
+        """Recording lint duration attached to the report of pylint item"""
+        duration = getattr(report, 'pylint_duration', None)
+        if duration is not None:
+            self.durations[report.nodeid] = duration
+
+    def pytest_sessionfinish(self):
+        """Storing durations of the files still present"""
+        rootdir = str(self.config.rootdir)
+        self.config.cache.set(DURATIONS_CACHE_KEY, {
+            nodeid: duration for nodeid, duration in self.durations.items()
+            if exists(join(rootdir, PYLINT_NODEID_RE.sub('', nodeid)))
+        })
+
+
+class LintTimings:
+    """Wall time of pylint items and time of pylint checkers collected by the controller.
+
+    Registered as a plugin of the controller (or the only process) with ``--pylint-timings``.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.files = {}
+        self.checkers = {}
+
+    def pytest_runtest_logreport(self, report):
+        """Adding times of pylint item report"""
+        if report.when != 'call' or not PYLINT_NODEID_RE.search(report.nodeid):
+            return
+        self.files[report.nodeid] = report.duration
+        for name, seconds in getattr(report, 'pylint_timings', {}).items():
+            self.checkers[name] = self.checkers.get(name, 0.0) + seconds
+
+    def pytest_terminal_summary(self, terminalreporter):
+        """Printing the slowest pylint items and the checkers sorted by time"""
+        terminalreporter.write_sep('=', 'pylint timings')
+        terminalreporter.write_line('slowest {0} pylint items:'.format(TIMINGS_SUMMARY_SIZE))
+        for nodeid, seconds in _by_time(self.files)[:TIMINGS_SUMMARY_SIZE]:
+            terminalreporter.write_line('{0:10.3f}s {1}'.format(seconds, nodeid))
+        terminalreporter.write_line('pylint checkers:')
+        for name, seconds in _by_time(self.checkers):
+            terminalreporter.write_line('{0:10.3f}s {1}'.format(seconds, name))
+
+    def pytest_sessionfinish(self):
+        """Writing the timings to ``--pylint-timings-json`` file"""
+        json_path = self.config.option.pylint_timings_json
+        if json_path:
+            with open(json_path, 'w') as json_file:
+                json.dump({'files': self.files, 'checkers': self.checkers}, json_file, indent=2, sort_keys=True)
+
+
+class LintReportWriter:
+    """Writes messages of pylint items to --pylint-report file as the controller gets the reports of the items.
+
+    Registered as a plugin of the controller (or the only process). No message is kept:
+    every one is written on its own line (starting with a comma unless it is the first one) and
+    the file is flushed with every report, so the file can be read during the session.
+    The document is closed at the end of the session.
+    """
+
+    def __init__(self, path):
+        self.sarif = path.endswith('.sarif')
+        self.count = 0
+        head, self.tail = report_document(self.sarif)
+        self.report_file = open(path, 'w')
+        self.report_file.write(head)
+        self.report_file.flush()
+
+    def pytest_runtest_logreport(self, report):
+        """Writing messages attached to the report of pylint item"""
+        messages = getattr(report, 'pylint_messages', None)
+        if not messages:
+            return
+        for message in messages:
+            entry = sarif_result(message) if self.sarif else message
+            self.report_file.write('\n{0}{1}'.format(',' if self.count else '', json.dumps(entry, sort_keys=True)))
+            self.count += 1
+        self.report_file.flush()
+
+    def pytest_sessionfinish(self):
+        """Closing the document"""
+        self.report_file.write('\n' + self.tail + '\n')
+        self.report_file.close()
+
+
+def report_document(sarif):
+    """Returns text of --pylint-report document before and after its messages"""
+    import pylint  # pylint: disable=import-outside-toplevel
+    if sarif:
+        document = {
+            '$schema': SARIF_SCHEMA,
+            'version': '2.1.0',
+            'runs': [{
+                'tool': {'driver': {
+                    'name': 'pylint', 'version': pylint.__version__, 'informationUri': 'https://pylint.pycqa.org',
+                }},
+                'results': [],
+            }],
+        }
+    else:
+        document = []
+    text = json.dumps(document)
+    # The messages are the last array of the document
+    split = text.rindex('[]') + 1
+    return text[:split], text[split:]
+
+
+def sarif_result(message):
+    """SARIF result of --pylint-report message"""
+    return {
+        'ruleId': message['msg_id'],
+        'level': SARIF_LEVELS.get(message['category'], 'note'),
+        'message': {'text': '{0} ({1})'.format(message['msg'], message['symbol'])},
+        'locations': [{'physicalLocation': {
+            'artifactLocation': {'uri': message['path'], 'uriBaseId': '%SRCROOT%'},
+            # pylint columns start at 0, SARIF ones at 1
+            'region': {'startLine': message['line'] or 1, 'startColumn': (message['column'] or 0) + 1},
+        }}],
+    }
+
+
+class LintWatcher:
+    """Relints changed files and their direct importers after the session with --pylint-watch.
+
+    Registered as a plugin of the controller (or the only process). The linter of
+    the process and astroid modules of unchanged files stay warm between changes,
+    only the modules of relinted files are built again. Files are watched by
+    inotify with the optional ``inotify_simple`` package and by polling their
+    stats otherwise. The watch ends with Ctrl-C.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.config = session.config
+        self.paths = set()
+        self.stats = {}
+        self.importers = {}
+        self._inotify = None
+        self._watch_dirs = {}
+
+    def pytest_collection_finish(self, session):
+        """Watching the files of lint items collected in the process"""
+        for item in session.items:
+            if is_lint_item(item):
+                self.paths.update(item.paths)
+
+    def pytest_xdist_node_collection_finished(self, node, ids):  # pylint: disable=unused-argument
+        """Watching the files of lint items collected by xdist workers"""
+        rootdir = str(self.config.rootdir)
+        for nodeid in ids:
+            if PYLINT_GROUP_NODEID_RE.search(nodeid):
+                # Node id of a group item is its directory, the linted files of the directory are watched
+                directory = py.path.local(join(rootdir, PYLINT_GROUP_NODEID_RE.sub('', nodeid)))
+                self.paths.update(
+                    path.strpath for path in directory.listdir('*.py') if is_linted_file(path, self.session))
+            elif PYLINT_NODEID_RE.search(nodeid):
+                self.paths.add(join(rootdir, PYLINT_NODEID_RE.sub('', nodeid)))
+
+    def pytest_unconfigure(self):
+        """Watching the files after everything of the session is reported"""
+        if self.paths:
+            self.watch()
+            # The watch configured the linters again after the session finish dropped them
+            import pylint_engine  # pylint: disable=import-outside-toplevel
+            pylint_engine.clear_warm_linters()
+
+    def watch(self):
+        """Relint the changed files until interrupted"""
+        self.changed_files(self.paths)
+        for path in self.paths:
+            self._add_imports(path)
+        self._write_line('watching {0} files for changes, Ctrl-C to stop'.format(len(self.paths)))
+        try:
+            while True:
+                self.relint(self.wait_for_changes())
+        except KeyboardInterrupt:
+            pass
+
+    def wait_for_changes(self):
+        """Blocks until some of the watched files change, returns their paths"""
+        interval = self.config.option.pylint_watch_interval
+        if inotify_simple is not None and self._inotify is None:
+            self._inotify = inotify_simple.INotify()
+            watched_events = inotify_simple.flags.CLOSE_WRITE | inotify_simple.flags.MOVED_TO
+            for directory in {dirname(path) for path in self.paths}:
+                self._watch_dirs[self._inotify.add_watch(directory, watched_events)] = directory
+        while True:
+            if self._inotify is not None:
+                events = self._inotify.read(read_delay=int(WATCH_READ_DELAY * 1000))
+                candidates = {join(self._watch_dirs[event.wd], event.name) for event in events}
+                changed = self.changed_files(candidates & self.paths)
+            else:
+                time.sleep(interval)
+                changed = self.changed_files(self.paths)
+            if changed:
+                return changed
+
+    def changed_files(self, paths):
+        """Returns the ``paths`` changed since the last call, removed files are not watched anymore"""
+        changed = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                self.paths.discard(path)
+                self.stats.pop(path, None)
+                continue
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if self.stats.get(path, signature) != signature:
+                changed.append(path)
+            self.stats[path] = signature
+        return sorted(changed)
+
+    def relint(self, changed):
+        """Lint the changed files and the files importing them, print the results as lint items do"""
+        import astroid  # pylint: disable=import-outside-toplevel
+        import pylint_engine  # pylint: disable=import-outside-toplevel
+        start = time.perf_counter()
+        affected = list(changed)
+        for path in changed:
+            module = module_name(path)
+            affected.extend(importer for importer in sorted(self.importers.get(module, ())) if importer not in affected)
+            self._add_imports(path)
+        # astroid builds the modules of the files again, the other modules are kept warm
+        affected_set = set(affected)
+        for modname, module in list(astroid.MANAGER.astroid_cache.items()):
+            if getattr(module, 'file', None) in affected_set:
+                del astroid.MANAGER.astroid_cache[modname]
+        msg_format, pylintrc_file = lint_item_settings(self.session)
+        fields = message_fields(msg_format)
+        results = pylint_engine.lint_files(
+            affected, pylintrc_file, fields=fields, max_messages=self.config.option.pylint_max_messages,
+            fail_fast=self.config.option.pylint_fail_fast)[0]
+        failed = 0
+        rootdir = str(self.config.rootdir)
+        for path in affected:
+            report = format_lint_result(results[path], msg_format, fields, self.config.option)
+            rel_path = get_rel_path(path, rootdir)
+            if report:
+                failed += 1
+                self._write_sep('_', '[pylint] {0}'.format(rel_path))
+                self._write_line(report)
+            else:
+                self._write_line('[pylint] {0} PASSED'.format(rel_path))
+        self._write_sep('=', '{0} relinted, {1} failed in {2:.2f}s'.format(
+            len(affected), failed, time.perf_counter() - start))
+
+    def _add_imports(self, path):
+        """Record the modules imported by the file, replacing the ones recorded before"""
+        for importers in self.importers.values():
+            importers.discard(path)
+        for module in imported_modules(path):
+            self.importers.setdefault(module, set()).add(path)
+
+    def _write_line(self, line):
+        terminal_reporter = self.config.pluginmanager.get_plugin('terminalreporter')
+        with self.config.pluginmanager.get_plugin('capturemanager').global_and_fixture_disabled():
+            terminal_reporter.write_line(line)
+
+    def _write_sep(self, sep_char, title):
+        terminal_reporter = self.config.pluginmanager.get_plugin('terminalreporter')
+        with self.config.pluginmanager.get_plugin('capturemanager').global_and_fixture_disabled():
+            terminal_reporter.write_sep(sep_char, title)
+
+
+def module_name(path):
+    """Dotted name of the module of the file within its packages"""
+    parts = [os.path.splitext(os.path.basename(path))[0]]
+    directory = dirname(path)
+    while exists(join(directory, '__init__.py')):
+        parts.append(os.path.basename(directory))
+        directory = dirname(directory)
+    if parts[0] == '__init__':
+        parts.pop(0)
+    return '.'.join(reversed(parts))
+
+
+def imported_files(path):
+    """Returns sorted paths of the project modules imported by the file.
+
+    Project modules are the ones found in the directory of the top package of
+    the file (of the file itself if it is not in a package), pylint finds them
+    there too. Only direct imports are followed.
+    """
+    base = dirname(path)
+    while exists(join(base, '__init__.py')):
+        base = dirname(base)
+    files = set()
+    for name in imported_modules(path):
+        module_path = join(base, *name.split('.'))
+        for candidate in (module_path + '.py', join(module_path, '__init__.py')):
+            if candidate != path and os.path.isfile(candidate):
+                files.add(candidate)
+    return sorted(files)
+
+
+def imported_modules(path):
+    """Returns names of the modules imported by the file, with their parent packages and imported names"""
+    try:
+        with open(path, 'rb') as source:
+            tree = ast.parse(source.read(), path)
+    except (OSError, SyntaxError, ValueError):
+        return set()
+    module = module_name(path)
+    package = module.split('.') if os.path.basename(path) == '__init__.py' else module.split('.')[:-1]
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            base = package[:len(package) - node.level + 1] if node.level else []
+            base = '.'.join(base + ([node.module] if node.module else []))
+            names = [base] + ['{0}.{1}'.format(base, alias.name) if base else alias.name for alias in node.names]
+        else:
+            continue
+        for name in names:
+            parts = name.split('.')
+            modules.update('.'.join(parts[:end]) for end in range(1, len(parts) + 1) if parts[0])
+    return modules
+
+
+def _by_time(timings):
+    """Timings items sorted by descending time"""
+    return sorted(timings.items(), key=lambda timing: (-timing[1], timing[0]))
+
+
+def order_longest_first(lint_items, durations):
+    """Returns pylint items (of files or --pylint-granularity groups) sorted by descending expected lint duration.
+
+    Items without recorded duration are estimated from the size of their files with
+    the duration per byte of the recorded ones. Ties keep the collection order, so
+    every xdist worker orders the same collection the same way.
+    """
+    expected = expected_durations({item.nodeid: item.paths for item in lint_items}, durations)
+    return sorted(lint_items, key=lambda item: expected[item.nodeid], reverse=True)
+
+
+def expected_durations(paths, durations):
+    """Returns expected lint duration of pylint items by node id, given the paths of their files.
+
+    The duration is the recorded one or the size of the files by the duration per byte
+    of the recorded items.
+    """
+    sizes = {}
+    for nodeid, item_paths in paths.items():
+        sizes[nodeid] = 0
+        for path in item_paths:
+            try:
+                sizes[nodeid] += os.path.getsize(path)
+            except OSError:
+                pass
+    recorded = [nodeid for nodeid in sizes if nodeid in durations]
+    recorded_size = sum(sizes[nodeid] for nodeid in recorded)
+    rate = sum(durations[nodeid] for nodeid in recorded) / recorded_size if recorded_size else 1.0
+    return {nodeid: durations.get(nodeid, size * rate) for nodeid, size in sizes.items()}
+
+
+def affinity_clusters(costs, affinity, max_cost):
+    """Returns the cluster of every file of ``costs`` (expected lint duration by path), named by one of its files.
+
+    Files importing one another (``imports`` affinity) and then files of a directory
+    are merged in the order of their paths while the cluster costs at most ``max_cost``,
+    so related files share astroid modules of one worker and the clusters still balance
+    the load. A file costing more is a cluster of its own.
+    """
+    parents = {path: path for path in costs}
+    cluster_costs = dict(costs)
+
+    def find(path):
+        while parents[path] != path:
+            parents[path] = parents[parents[path]]
+            path = parents[path]
+        return path
+
+    def merge(first, second):
+        """Merge clusters of the files if the cost allows, returns whether they are one cluster"""
+        first, second = find(first), find(second)
+        if first == second:
+            return True
+        if cluster_costs[first] + cluster_costs[second] > max_cost:
+            return False
+        parents[second] = first
+        cluster_costs[first] += cluster_costs.pop(second)
+        return True
+
+    paths = sorted(costs)
+    if affinity == 'imports':
+        modules = {module_name(path): path for path in paths}
+        for path in paths:
+            # The imported modules before their parent packages
+            for module in sorted(imported_modules(path), key=lambda name: (-name.count('.'), name)):
+                if module in modules:
+                    merge(path, modules[module])
+    anchor = None
+    for path in paths:
+        if anchor is None or dirname(anchor) != dirname(path):
+            anchor = path
+        elif not merge(anchor, path) and cluster_costs[find(path)] < cluster_costs[find(anchor)]:
+            # The cluster with more room takes the next files of the directory
+            anchor = path
+    return {path: find(path) for path in paths}
+
+
+class PyLintScheduling(LoadScopeScheduling):
+    """xdist scheduling sending every batch of pylint items to one worker.
+
+    The batches are restored from the collection order the same way
+    ``pytest_collection_modifyitems`` builds them on workers, separately for
+    every node id suffix (--pylint-tiers pass); any other test is a work unit
+    of its own, so it is load balanced as with ``--dist=load``.
+    """
+
+    def __init__(self, config, log=None):
+        super(PyLintScheduling, self).__init__(config, log)
+        self.batch_size = config.option.pylint_batch_size
+        self._scopes = None
+
+    def _split_scope(self, nodeid):
+        if self._scopes is None:
+            self._scopes = {}
+            counts = {}
+            for node in self.collection:
+                match = PYLINT_NODEID_RE.search(node)
+                if match:
+                    index = counts[match.group()] = counts.get(match.group(), -1) + 1
+                    self._scopes[node] = 'pylint-batch-{0}{1}'.format(index // self.batch_size, match.group())
+        return self._scopes.get(nodeid, nodeid)
+
+
+class PyLintAffinityScheduling(LoadScopeScheduling):
+    """xdist scheduling sending clusters of related pylint items to one worker with --pylint-affinity.
+
+    The clusters of ``affinity_clusters`` cost at most half of the expected lint
+    duration per worker and the workers get them longest first, so one worker
+    infers the modules of a package once and the load stays balanced. Any other
+    test is a work unit of its own, as with ``--dist=load``.
+    """
+
+    def __init__(self, config, log=None):
+        super(PyLintAffinityScheduling, self).__init__(config, log)
+        self.config = config
+        self._scopes = None
+        self._costs = {}
+        self._ordered = False
+
+    def _split_scope(self, nodeid):
+        if self._scopes is None:
+            self._scopes = self._cluster_scopes()
+        return self._scopes.get(nodeid, nodeid)
+
+    def _cluster_scopes(self):
+        """Work unit of every pylint item of the collection, recording the expected duration of the units"""
+        rootdir = str(self.config.rootdir)
+        paths = {
+            nodeid: join(rootdir, PYLINT_NODEID_RE.sub('', nodeid))
+            for nodeid in self.collection if PYLINT_NODEID_RE.search(nodeid)
+        }
+        durations = getattr(self.config, 'pylint_workerinput', {}).get('pylint_durations', {})
+        expected = expected_durations({nodeid: [path] for nodeid, path in paths.items()}, durations)
+        costs = {}
+        for nodeid, path in paths.items():
+            costs[path] = costs.get(path, 0.0) + expected[nodeid]
+        max_cost = sum(costs.values()) / (2 * max(1, len(self.nodes)))
+        clusters = affinity_clusters(costs, self.config.option.pylint_affinity, max_cost)
+        scopes = {}
+        for nodeid, path in paths.items():
+            scope = scopes[nodeid] = 'pylint-affinity-{0}'.format(get_rel_path(clusters[path], rootdir))
+            self._costs[scope] = self._costs.get(scope, 0.0) + expected[nodeid]
+        return scopes
+
+    def _assign_work_unit(self, node):
+        if not self._ordered:
+            # The longest units go first, other tests keep their places
+            self._ordered = True
+            clusters = iter(sorted(
+                (scope for scope in self.workqueue if scope in self._costs), key=self._costs.get, reverse=True))
+            for scope in [next(clusters) if scope in self._costs else scope for scope in self.workqueue]:
+                self.workqueue.move_to_end(scope)
+        super(PyLintAffinityScheduling, self)._assign_work_unit(node)
+
+    def _reschedule(self, node):
+        # A node linting a cluster gets the next unit at the last item of the cluster (a worker
+        # runs an item when it has the next one), a unit queued behind the cluster would wait
+        # for it instead of running elsewhere
+        pending = sum(
+            self._pending_of({scope: work_unit})
+            for scope, work_unit in self.assigned_work[node].items() if scope in self._costs
+        )
+        if pending > 1:
+            return
+        super(PyLintAffinityScheduling, self)._reschedule(node)
 
 
 def get_rel_path(path, parent_path):
@@ -50,7 +1264,7 @@ def get_rel_path(path, parent_path):
     Give the path to object relative to ``parent_path``.
     """
     replaced_path = path.replace(parent_path, '', 1)
-    if replaced_path[0] == sep:
+    if replaced_path[:1] == sep:
         rel_path = replaced_path[1:]
     else:
         rel_path = replaced_path
@@ -81,19 +1295,186 @@ def pytest_addoption(parser):
         action="store_true", default=False,
         help='Disable vcs files linting mode. Note: this option does not turn off pylint'
     )
+    group.addoption(
+        '--pylint-vcs-since',
+        metavar='REV',
+        help='Lint files changed since the revision (svn revision or git commit) instead of the last commit, '
+        'svn ranges of revision numbers are memoized in pytest cache'
+    )
+    group.addoption(
+        '--pylint-vcs-working-copy',
+        action="store_true", default=False,
+        help='Lint local changes of svn working copy too, git changes are always compared with the working tree'
+    )
     group.addoption(
         '--pylint-rcfile',
         default=None,
         help='Location of RC file if not pylintrc'
     )
+    group.addoption(
+        '--pylint-no-cache',
+        action="store_true", default=False,
+        help='Disable reusing pylint results of unchanged files stored in pytest cache directory'
+    )
+    group.addoption(
+        '--pylint-cache-size',
+        type=int, default=DEFAULT_CACHE_SIZE,
+        help='Maximal number of linted files results kept in pytest cache directory, '
+        'least recently used ones are evicted (default: %(default)s)'
+    )
+    group.addoption(
+        '--pylint-shared-store',
+        metavar='DIR',
+        help='Directory (e.g. on a network mount) of lint results shared by machines linting the same '
+        'files, checked before linting a file and updated after'
+    )
+    group.addoption(
+        '--pylint-shared-store-size',
+        type=int, default=DEFAULT_SHARED_STORE_SIZE, metavar='MB',
+        help='Maximal size of --pylint-shared-store in megabytes, least recently used results are '
+        'evicted (default: %(default)s)'
+    )
+    group.addoption(
+        '--pylint-batch-size',
+        type=int, default=1,
+        help='Lint collected files in batches of given size with single pylint check per batch, '
+        'every file is still reported as separate item (default: %(default)s)'
+    )
+    group.addoption(
+        '--pylint-jobs',
+        type=jobs_count, default=1, metavar='N|auto',
+        help='Lint collected files in pool of N processes (auto for number of CPUs) started right after '
+        'collection, pylint items only report the results. Ignored by xdist workers (default: %(default)s)'
+    )
+    group.addoption(
+        '--pylint-max-messages',
+        type=int, default=0, metavar='N',
+        help='Store and report at most N messages per file, the rest is only counted (default: no limit)'
+    )
+    group.addoption(
+        '--pylint-fail-fast',
+        action='store_const', const='any', default=None,
+        help='Stop linting a file on its first message'
+    )
+    group.addoption(
+        '--pylint-fail-fast-category',
+        default=None, choices=('any',) + MESSAGE_CATEGORIES[1:], metavar='CATEGORY',
+        help='Stop linting a file on its first message of given or more severe category: '
+        'convention, refactor, warning, error, fatal or any, implies --pylint-fail-fast'
+    )
+    group.addoption(
+        '--pylint-granularity',
+        default='file', choices=('file', 'package', 'chunk'),
+        help='Lint item of every file (default), of every directory (package) or of every group of files of '
+        'a directory of about --pylint-chunk-size (chunk), the failures of the files are reported by the item'
+    )
+    group.addoption(
+        '--pylint-chunk-size',
+        type=int, default=256, metavar='KB',
+        help='Size of files linted by one item with --pylint-granularity=chunk (default: %(default)s)'
+    )
+    group.addoption(
+        '--pylint-timeout',
+        type=float, default=None, metavar='SECONDS',
+        help='Lint every file in a supervised child process killed after given seconds, the item fails'
+    )
+    group.addoption(
+        '--pylint-max-memory',
+        type=int, default=None, metavar='MB',
+        help='Lint every file in a supervised child process which may allocate given megabytes, the item fails '
+        'when it runs out of them'
+    )
+    group.addoption(
+        '--pylint-tiers',
+        action='store_const', const='all', default=None,
+        help='Lint every file in two passes reported as separate items: [pylint-tier1] with checkers without '
+        'inference run first, then [pylint-tier2] with the others'
+    )
+    group.addoption(
+        '--pylint-tiers-passed',
+        action='store_true', default=False,
+        help='Run the second --pylint-tiers pass only for the files which passed the first one, implies --pylint-tiers'
+    )
+    group.addoption(
+        '--pylint-duplicates',
+        action="store_true", default=False,
+        help='Report code duplicated across linted files as [pylint-duplicates] items, the index of '
+        'line windows is kept in pytest cache and updated only for changed files'
+    )
+    group.addoption(
+        '--pylint-watch',
+        action="store_true", default=False,
+        help='After the session keep the linter warm and relint changed files and their direct importers '
+        'until interrupted'
+    )
+    group.addoption(
+        '--pylint-watch-interval',
+        type=float, default=0.25, metavar='SECONDS',
+        help='Interval of polling the watched files when inotify_simple is not installed (default: %(default)s)'
+    )
+    group.addoption(
+        '--pylint-daemon',
+        metavar='SOCKET',
+        help='Unix socket of the lint daemon (python -m lint_daemon --socket SOCKET) keeping warm '
+        'linters between the runs, the files are linted in the process when it is not reachable'
+    )
+    group.addoption(
+        '--pylint-affinity',
+        default=None, choices=('package', 'imports'),
+        help='Send pylint items of files of a directory (package) or of files importing one another and then of '
+        'a directory (imports) to one xdist worker, so its astroid cache serves them all. Clusters are limited '
+        'by expected lint duration to keep the load balanced'
+    )
+    group.addoption(
+        '--pylint-prefetch',
+        action="store_true", default=False,
+        help='Run pylint items after the other tests while --pylint-jobs pool (single process by default) '
+        'lints their files in background. Ignored by xdist workers'
+    )
+    group.addoption(
+        '--pylint-timings',
+        action="store_true", default=False,
+        help='Measure wall time of pylint items and time of every pylint checker, print them sorted by time'
+    )
+    group.addoption(
+        '--pylint-timings-json',
+        default=None, metavar='PATH',
+        help='Write the timings of --pylint-timings to JSON file, implies --pylint-timings'
+    )
+    group.addoption(
+        '--pylint-report',
+        default=None, metavar='PATH',
+        help='Write messages of pylint items to JSON (.json) or SARIF (.sarif) file as the items finish, '
+        'one message per line'
+    )
+
+
+def jobs_count(value):
+    """Number of ``--pylint-jobs`` processes, ``auto`` is the number of CPUs"""
+    if value == 'auto':
+        return os.cpu_count() or 1
+    return int(value)
+
+
+def pool_jobs(config):
+    """Number of processes of the pool linting files in background or 0 if pylint items lint them.
+
+    xdist workers lint in their own process.
+    """
+    jobs = config.option.pylint_jobs
+    if hasattr(config, 'workerinput') or jobs <= 1 and not config.option.pylint_prefetch:
+        return 0
+    return max(jobs, 1)
 
 
 def pytest_sessionstart(session):
     """Storing pylint settings on the session"""
     config = session.config
-    terminal_reporter = config.pluginmanager.get_plugin('terminalreporter')
-    capture_manager = config.pluginmanager.get_plugin('capturemanager')
     session.pylint_enabled = config.option.pylint or config.option.pylint_vcs and not config.option.no_pylint
+    _set_implied_options(config.option)
+    # Computed once by the controller and sent to xdist workers within their workerinput
+    config.pylint_workerinput = {}
+    workerinput = getattr(config, 'workerinput', {})
 
     if session.pylint_enabled:
         session.pylint_config = None
@@ -101,21 +1482,37 @@ def pytest_sessionstart(session):
         session.pylint_ignore = []
         session.pylint_ignore_patterns = []
         session.pylint_msg_template = None
+        session.pylint_cache = None
+        session.pylint_shared_store = None
+        # Results of --pylint-tiers first pass by path, the second pass of --pylint-tiers-passed checks them
+        session.pylint_tier1_results = {}
+
+        variant = 'max-messages={0},fail-fast={1}'.format(
+            config.option.pylint_max_messages, config.option.pylint_fail_fast)
+        if not config.option.pylint_no_cache and getattr(config, 'cache', None) is not None:
+            session.pylint_cache = LintResultCache(
+                config.cache.makedir('pylint'), config.option.pylint_cache_size, variant)
+        if config.option.pylint_shared_store:
+            session.pylint_shared_store = SharedResultStore(
+                config.option.pylint_shared_store, config.rootdir,
+                config.option.pylint_shared_store_size * 1024 * 1024, variant)
+
+        session.pylint_daemon = None
+        if config.option.pylint_daemon:
+            # Modules of the files of the session are built again by the daemon once per session
+            token = workerinput.get('pylint_session_token', uuid.uuid4().hex)
+            config.pylint_workerinput['pylint_session_token'] = token
+            import lint_daemon  # pylint: disable=import-outside-toplevel
+            session.pylint_daemon = lint_daemon.LintDaemonClient(
+                config.option.pylint_daemon, token, str(config.rootdir))
 
-        if config.option.pylint_vcs:
-            if not config.option.pylint_no_vcs:
-                scm, scm_root = _get_vcs_root(str(config.rootdir))
-                if scm:
-                    session.pylint_vcs_enabled = True
-                    session.pylint_vcs_changed_filepaths = scm.get_mod_files(scm_root)
-                    with capture_manager.global_and_fixture_disabled():
-                        terminal_reporter.write('VCS working copy detected. VCS linting mode enabled\n')
-                else:
-                    with capture_manager.global_and_fixture_disabled():
-                        terminal_reporter.write(
-                            'No VCS working copy detected. VCS linting mode disabled: linting all the files\n')
+        if config.option.pylint_vcs and not config.option.pylint_no_vcs:
+            _configure_vcs_mode(session)
+
+        _register_plugins(session)
 
         # Find pylintrc to check ignore list
+        from pylint.config import PYLINTRC  # pylint: disable=import-outside-toplevel
         pylintrc_file = config.option.pylint_rcfile or PYLINTRC
 
         if pylintrc_file and not exists(pylintrc_file):
@@ -128,18 +1525,21 @@ def pytest_sessionstart(session):
             session.pylint_config.read(pylintrc_file)
 
             try:
-                ignore_string = session.pylint_config.get('MASTER', 'ignore')
-                if ignore_string:
-                    session.pylint_ignore = ignore_string.split(',')
+                session.pylint_ignore = split_csv(session.pylint_config.get('MASTER', 'ignore'))
             except (NoSectionError, NoOptionError):
                 pass
 
             try:
-                session.pylint_ignore_patterns = session.pylint_config.get(
-                    'MASTER', 'ignore-patterns')
+                session.pylint_ignore_patterns = split_csv(session.pylint_config.get(
+                    'MASTER', 'ignore-patterns'))
             except (NoSectionError, NoOptionError):
                 pass
 
+            session.pylint_ignore_matcher = IgnoreMatcher(session.pylint_ignore, session.pylint_ignore_patterns)
+            if selects_lint_items_only(config.option.markexpr) and not getattr(session, 'pylint_vcs_enabled', False):
+                # Only lint items are selected, ignored directories hold nothing to run
+                config.pylint_ignore_matcher = session.pylint_ignore_matcher
+
             try:
                 session.pylint_msg_template = session.pylint_config.get(
                     'REPORTS', 'msg-template'
@@ -147,6 +1547,231 @@ def pytest_sessionstart(session):
             except (NoSectionError, NoOptionError):
                 pass
 
+        if config.option.pylint_duplicates:
+            session.pylint_duplicate_index = DuplicateIndex(config, **duplicate_settings(session))
+
+
+def _set_implied_options(option):
+    """Setting the options implied by the others, the category of --pylint-fail-fast and the tiers to run"""
+    if option.pylint_fail_fast_category:
+        option.pylint_fail_fast = option.pylint_fail_fast_category
+    if option.pylint_tiers_passed:
+        option.pylint_tiers = 'passed'
+
+
+def _register_plugins(session):
+    """Registering the plugins of enabled features"""
+    config = session.config
+    if not hasattr(config, 'workerinput') and getattr(config, 'cache', None) is not None:
+        lint_durations = LintDurations(config)
+        config.pluginmanager.register(lint_durations, 'pylint-durations')
+        config.pylint_workerinput['pylint_durations'] = lint_durations.previous
+
+    if config.option.pylint_tiers:
+        if config.option.pylint_granularity != 'file':
+            raise pytest.UsageError('--pylint-tiers needs the default --pylint-granularity=file')
+        config.pluginmanager.register(LintTier2Collector(), 'pylint-tier2')
+
+    if config.option.pylint_granularity != 'file':
+        if config.option.pylint_affinity:
+            raise pytest.UsageError(
+                '--pylint-affinity needs the default --pylint-granularity=file, a group item keeps its files together')
+        config.pluginmanager.register(LintGroupCollector(), 'pylint-group')
+
+    if config.option.pylint_affinity and config.option.pylint_batch_size > 1:
+        raise pytest.UsageError(
+            '--pylint-affinity keeps related files on a worker, --pylint-batch-size would split them')
+
+    if config.option.pylint_duplicates:
+        config.pluginmanager.register(DuplicatesCollector(config), 'pylint-duplicates')
+
+    if config.option.pylint_timings_json:
+        config.option.pylint_timings = True
+    if config.option.pylint_timings and not hasattr(config, 'workerinput'):
+        config.pluginmanager.register(LintTimings(config), 'pylint-timings')
+
+    report_path = config.option.pylint_report
+    if report_path and not hasattr(config, 'workerinput'):
+        if not report_path.endswith(('.json', '.sarif')):
+            raise pytest.UsageError('--pylint-report file has to be .json or .sarif, got: {0}'.format(report_path))
+        config.pluginmanager.register(LintReportWriter(report_path), 'pylint-report')
+
+    if config.option.pylint_watch and not hasattr(config, 'workerinput'):
+        config.pluginmanager.register(LintWatcher(session), 'pylint-watch')
+
+
+def _configure_vcs_mode(session):
+    """Storing VCS changed files on the session"""
+    config = session.config
+    workerinput = getattr(config, 'workerinput', None)
+    if workerinput is not None and 'pylint_vcs_root' in workerinput:
+        # xdist worker gets VCS state from the controller instead of querying VCS again
+        scm_root = workerinput['pylint_vcs_root']
+        changed_filepaths = workerinput['pylint_vcs_changed_filepaths']
+    else:
+        terminal_reporter = config.pluginmanager.get_plugin('terminalreporter')
+        capture_manager = config.pluginmanager.get_plugin('capturemanager')
+        scm, scm_root = _get_vcs_root(str(config.rootdir))
+        try:
+            changed_filepaths = scm.get_mod_files(scm_root, **_vcs_options(config, scm)) if scm else None
+        except ValueError as error:
+            raise pytest.UsageError('--pylint-vcs-since={0}: {1}'.format(config.option.pylint_vcs_since, error))
+        config.pylint_workerinput['pylint_vcs_root'] = scm_root
+        config.pylint_workerinput['pylint_vcs_changed_filepaths'] = changed_filepaths
+        with capture_manager.global_and_fixture_disabled():
+            if scm:
+                terminal_reporter.write('VCS working copy detected. VCS linting mode enabled\n')
+            else:
+                terminal_reporter.write(
+                    'No VCS working copy detected. VCS linting mode disabled: linting all the files\n')
+    if scm_root:
+        session.pylint_vcs_enabled = True
+        session.pylint_vcs_root = scm_root
+        session.pylint_vcs_changed_filepaths = set(changed_filepaths)
+        if selects_lint_items_only(config.option.markexpr):
+            # Only lint items are selected, directories without changed files hold nothing to run
+            config.pylint_vcs_collect_paths = with_parent_dirs(changed_filepaths)
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    """Ordering pylint items of xdist worker longest first or after the other tests with prefetch,
+    splitting them into batches"""
+    lint_items = [item for item in items if is_lint_item(item)]
+    durations = getattr(config, 'workerinput', {}).get('pylint_durations')
+    if durations is not None and lint_items:
+        # Long files are scheduled first and do not keep one worker busy when the others are done
+        lint_items = order_longest_first(lint_items, durations)
+        ordered = iter(lint_items)
+        items[:] = [next(ordered) if is_lint_item(item) else item for item in items]
+
+    if config.option.pylint_tiers:
+        # The second tier runs after the quick feedback of the first one
+        items.sort(key=lambda item: isinstance(item, PyLintItem) and item.tier == 2)
+    if config.option.pylint_prefetch and pool_jobs(config):
+        # Pool lints the files while the other tests run, pylint items report the results at the end
+        items.sort(key=is_lint_item)
+
+    batch_size = config.option.pylint_batch_size
+    if batch_size > 1 or pool_jobs(config):
+        # Group items lint their files in one check already
+        for tier in sorted({item.tier for item in lint_items if isinstance(item, PyLintItem)}):
+            tier_items = [item for item in items if isinstance(item, PyLintItem) and item.tier == tier]
+            for start in range(0, len(tier_items), batch_size):
+                batch = LintBatch(tier_items[start:start + batch_size])
+                for item in batch.items:
+                    item.batch = batch
+
+
+def pytest_collection_finish(session):
+    """Submitting the batches of collected pylint items and the group items to ``--pylint-jobs`` pool,
+    longest first"""
+    jobs = pool_jobs(session.config)
+    lint_items = [item for item in session.items if is_lint_item(item)]
+    if jobs and lint_items:
+        session.pylint_pool = multiprocessing.Pool(min(jobs, len(lint_items)))
+        durations = session.config.pylint_workerinput.get('pylint_durations', {})
+        submitted = set()
+        for item in order_longest_first(lint_items, durations):
+            if isinstance(item, PyLintGroupItem):
+                item.submit(session.pylint_pool)
+            elif id(item.batch) not in submitted:
+                submitted.add(id(item.batch))
+                item.batch.submit(session.pylint_pool)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """Sending the controller pylint session state to xdist worker"""
+    node.workerinput.update(getattr(node.config, 'pylint_workerinput', {}))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    """Keeping clusters of related pylint items or every batch of them on one xdist worker"""
+    if config.option.pylint_affinity and config.getvalue('dist') == 'load':
+        return PyLintAffinityScheduling(config, log)
+    if (config.option.pylint_batch_size > 1 and config.option.pylint_granularity == 'file'
+            and config.getvalue('dist') == 'load'):
+        return PyLintScheduling(config, log)
+    return None
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Attaching lint duration, checkers time and --pylint-report messages to the report,
+    xdist sends them to the controller"""
+    outcome = yield
+    if call.when != 'call':
+        return
+    report = outcome.get_result()
+    messages = getattr(item, 'report_messages', None)
+    if messages is not None:
+        report.pylint_messages = messages
+    lint_duration = getattr(item, 'lint_duration', None)
+    if lint_duration is not None:
+        report.pylint_duration = lint_duration
+    lint_timings = getattr(item, 'lint_timings', None)
+    if lint_timings is not None:
+        report.pylint_timings = lint_timings
+
+
+def pytest_sessionfinish(session):
+    """Evicting outdated lint results once per run, xdist workers leave it to the controller"""
+    # A linter is configured for the session options, in-process runs (pytester) must not share it
+    if getattr(session, 'pylint_enabled', False):
+        import pylint_engine  # pylint: disable=import-outside-toplevel
+        pylint_engine.clear_warm_linters()
+        _LIMITED_LINT_CHILD.stop()
+    pool = getattr(session, 'pylint_pool', None)
+    if pool is not None:
+        # Results of not run items (--exitfirst, interrupted session) are not waited for
+        pool.terminate()
+        pool.join()
+    if not hasattr(session.config, 'workerinput'):
+        for cache in (getattr(session, 'pylint_cache', None), getattr(session, 'pylint_shared_store', None)):
+            if cache is not None:
+                cache.evict()
+
+
+def with_parent_dirs(paths):
+    """Returns set of the paths and all their parent directories"""
+    result = set()
+    for path in paths:
+        while path not in result:
+            result.add(path)
+            path = dirname(path)
+    return result
+
+
+def selects_lint_items_only(markexpr):
+    """Whether the ``-m`` mark expression deselects every item without the ``pylint`` mark,
+    evaluated for all marks of the other names of the expression as pytest evaluates it"""
+    if not markexpr:
+        return False
+    names = sorted(set(re.findall(r'[A-Za-z_]\w*', markexpr)) - {'and', 'or', 'not', 'pylint'})
+    if len(names) > MARKEXPR_MAX_NAMES:
+        return False
+    for values in itertools.product((False, True), repeat=len(names)):
+        marks = dict(zip(names, values), pylint=False)
+        try:
+            if eval(markexpr, {'__builtins__': {}}, marks):  # pylint: disable=eval-used
+                return False
+        except (SyntaxError, NameError, TypeError, AttributeError):
+            return False
+    return True
+
+
+def pytest_ignore_collect(path, config):
+    """Pruning paths without VCS changed files or ignored by pylintrc when running lint only"""
+    collect_paths = getattr(config, 'pylint_vcs_collect_paths', None)
+    if collect_paths is not None and str(path) not in collect_paths:
+        return True
+    ignore_matcher = getattr(config, 'pylint_ignore_matcher', None)
+    if ignore_matcher is not None and ignore_matcher.ignores_dir(get_rel_path(str(path), str(config.rootdir))):
+        return True
+    return None
+
 
 def pytest_report_header(config, startdir):
     """Add the message_ix import path to the pytest report header."""
@@ -155,49 +1780,186 @@ def pytest_report_header(config, startdir):
     return None
 
 
+def split_csv(value):
+    """Split comma separated pylintrc option value"""
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+
+class IgnoreMatcher:
+    """Compiled check of pylintrc ``ignore`` and ``ignore-patterns`` against paths relative to rootdir.
+
+    A path is ignored if any of its parts is in ``ignore`` list or any of ``ignore-patterns``
+    matches the beginning of the whole path.
+    """
+
+    def __init__(self, ignore_list=(), ignore_patterns=()):
+        self.ignore_names = frozenset(ignore_list)
+        self.pattern = None
+        if ignore_patterns:
+            self.pattern = re.compile('|'.join('(?:{0})'.format(pattern) for pattern in ignore_patterns))
+
+    def ignores(self, rel_path):
+        """Checks if a file is ignored"""
+        if self.pattern is not None and self.pattern.match(rel_path):
+            return True
+        return not self.ignore_names.isdisjoint(rel_path.split(sep))
+
+    def ignores_dir(self, rel_path):
+        """Checks if a directory and so every file below it is ignored.
+
+        The parents are pruned before their content is visited, so only the last part
+        of the path is compared against ``ignore``. A pattern has to match the path with
+        trailing separator, which is the beginning of every file path below it.
+        """
+        if self.pattern is not None and self.pattern.match(rel_path + sep):
+            return True
+        return rel_path.rpartition(sep)[2] in self.ignore_names
+
+
 def include_file(path, ignore_list, ignore_patterns=None):
     """Checks if a file should be included in the collection."""
-    if ignore_patterns:
-        for pattern in ignore_patterns:
-            if re.match(pattern, path):
-                return False
-    parts = path.split(sep)
-    return not set(parts) & set(ignore_list)
+    return not IgnoreMatcher(ignore_list, ignore_patterns).ignores(path)
 
 
 def pytest_collect_file(path, parent):
     """Collect files on which pylint should run"""
-    item = None
-
-    if not parent.session.pylint_enabled:
+    if parent.config.option.pylint_granularity != 'file':
+        # ``LintGroupCollector`` collects the group items of the files instead
         return None
-    if path.ext != '.py':
+    return collect_lint_item(path, parent, 1 if parent.config.option.pylint_tiers else 0)
+
+
+def is_lint_item(item):
+    """Checks if the item lints files, a file item or a --pylint-granularity group one"""
+    return isinstance(item, (PyLintItem, PyLintGroupItem))
+
+
+def chunk_paths(paths, chunk_size):
+    """Split the files into groups of about ``chunk_size`` bytes with total sizes as even as possible"""
+    sizes = {path: path.size() for path in paths}
+    chunks = [[] for _ in range(max(1, -(-sum(sizes.values()) // chunk_size)))]
+    totals = [0] * len(chunks)
+    # The largest files first, each into the smallest chunk
+    for path in sorted(paths, key=lambda path: (-sizes[path], path)):
+        smallest = totals.index(min(totals))
+        chunks[smallest].append(path)
+        totals[smallest] += sizes[path]
+    return [sorted(chunk) for chunk in chunks if chunk]
+
+
+def is_linted_file(path, session):
+    """Checks if pylint runs on the file"""
+    if not session.pylint_enabled or path.ext != '.py':
+        return False
+    if getattr(session, 'pylint_vcs_enabled', False):
+        return str(path) in session.pylint_vcs_changed_filepaths
+    if session.pylint_config is None:
+        return True
+    return not session.pylint_ignore_matcher.ignores(get_rel_path(str(path), str(session.fspath)))
+
+
+class DuplicatesCollector:
+    """Plugin collecting duplicate code item of every linted file with --pylint-duplicates.
+
+    Only the controller (or the only process) stores the index: xdist workers read the
+    stored entries and index the files changed since in memory, the controller indexes
+    the files of the items run by the workers at the end.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.paths = set()
+
+    @staticmethod
+    def pytest_collect_file(path, parent):
+        """Collect files checked for code duplicated in other files"""
+        if is_linted_file(path, parent.session):
+            return DuplicateCodeItem(path, parent)
         return None
 
-    if getattr(parent.session, 'pylint_vcs_enabled', False):
-        if str(path) in parent.session.pylint_vcs_changed_filepaths:
-            item = PyLintItem(path, parent)
-    else:
-        rel_path = get_rel_path(str(path), str(parent.session.fspath))
+    def pytest_runtest_logreport(self, report):
+        """Recording the file of duplicate code item, the controller gets the reports of all workers"""
+        if report.when == 'call' and report.nodeid.endswith(DUPLICATES_NODEID_SUFFIX):
+            self.paths.add(join(str(self.config.rootdir), report.nodeid[:-len(DUPLICATES_NODEID_SUFFIX)]))
+
+    def pytest_sessionfinish(self, session):
+        """Storing the index with the files of all duplicate code items"""
+        index = getattr(session, 'pylint_duplicate_index', None)
+        if index is not None and not hasattr(self.config, 'workerinput'):
+            index.add(sorted(self.paths))
+            index.save()
+
+
+class LintGroupCollector:
+    """Plugin collecting --pylint-granularity group items of the linted files of every directory.
+
+    The files are only recorded by directory during collection, the group items
+    are added to the collected items before marks and keywords select them.
+    """
+
+    def __init__(self):
+        self.paths = {}
+
+    def pytest_collect_file(self, path, parent):
+        """Record the linted file, a file argument gets a node without items"""
         session = parent.session
-        if session.pylint_config is None:
-            item = PyLintItem(path, parent)
-        elif include_file(rel_path, session.pylint_ignore, session.pylint_ignore_patterns):
-            item = PyLintItem(path, parent, session.pylint_msg_template, session.pylintrc_file)
-    return item
+        # ``__init__.py`` of the packages of file arguments are collected too, they are not linted
+        if not is_linted_file(path, session) or not any(session.isinitpath(part) for part in path.parts()):
+            return None
+        self.paths.setdefault(path.dirpath(), []).append(path)
+        if session.isinitpath(path):
+            # A file argument without any node is reported as not found
+            return PyLintGroupFile(path, parent)
+        return None
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_collection_modifyitems(self, session, items):
+        """Adding the group items of the recorded files"""
+        for directory, paths in self.paths.items():
+            items.extend(PyLintGroupCollector(directory, session, sorted(paths)).collect())
+        self.paths = {}
+
+
+class LintTier2Collector:
+    """Plugin collecting second pylint item of every linted file with --pylint-tiers"""
 
+    @staticmethod
+    def pytest_collect_file(path, parent):
+        """Collect files on which second tier of pylint should run"""
+        return collect_lint_item(path, parent, 2)
+
+
+def collect_lint_item(path, parent, tier=0):
+    """Returns pylint item of the ``tier`` for the file or None if it is not linted"""
+    session = parent.session
+    if not is_linted_file(path, session):
+        return None
+    item_class = PyLintTier2Item if tier == 2 else PyLintItem
+    msg_format, pylintrc_file = lint_item_settings(session)
+    return item_class(path, parent, msg_format, pylintrc_file, tier)
 
-class PyLintItem(pytest.Item, pytest.File):
+
+def lint_item_settings(session):
+    """Returns message format and pylintrc file of the session lint items"""
+    if getattr(session, 'pylint_vcs_enabled', False) or session.pylint_config is None:
+        return DEFAULT_MSG_FORMAT, None
+    return session.pylint_msg_template or DEFAULT_MSG_FORMAT, session.pylintrc_file
+
+
+class PyLintItem(pytest.Item, pytest.File):  # pylint: disable=too-many-instance-attributes
     """pylint test running class."""
     # pylint doesn't deal well with dynamic modules and there isn't an
     # astng plugin for pylint in pypi yet, so we'll have to disable
     # the checks.
     # pylint: disable=no-member,abstract-method
-    def __init__(self, fspath, parent, msg_format=None, pylintrc_file=None):
+    def __init__(self, fspath, parent, msg_format=None, pylintrc_file=None, tier=0):
         super(PyLintItem, self).__init__(fspath, parent)
 
         self.add_marker('pylint')
-        self._nodeid = self.nodeid + '[pylint]'
+        # --pylint-tiers pass of the item, 0 runs all checkers
+        self.tier = tier
+        self.tag = 'pylint-tier{0}'.format(tier) if tier else 'pylint'
+        self._nodeid = '{0}[{1}]'.format(self.nodeid, self.tag)
 
         self.rel_path = get_rel_path(
             fspath.strpath,
@@ -205,27 +1967,210 @@ class PyLintItem(pytest.Item, pytest.File):
         )
 
         if msg_format is None:
-            self._msg_format = '{C}:{line:3d},{column:2d}: {msg} ({symbol})'
+            self._msg_format = DEFAULT_MSG_FORMAT
         else:
             self._msg_format = msg_format
+        # Message records keep only the fields of the format
+        self.message_fields = message_fields(self._msg_format, report_fields(self.config))
 
         self.pylintrc_file = pylintrc_file
+        self.batch = None
+        self.lint_duration = None
+        self.lint_timings = None
+        # Messages of the item for --pylint-report, sent to the controller with the item report
+        self.report_messages = None
+        self._store_keys = {}
+
+    @property
+    def paths(self):
+        """Paths of the files linted by the item"""
+        return [self.fspath.strpath]
+
+    @property
+    def reporter_options(self):
+        """Options of ``ProgrammaticReporter`` collecting messages of the item"""
+        return {
+            'fields': self.message_fields,
+            'max_messages': self.config.option.pylint_max_messages,
+            'fail_fast': self.config.option.pylint_fail_fast,
+            'tier': self.tier,
+        }
+
+    def _result_stores(self, tier):
+        """``(store, key)`` pairs of the results cache and the shared store keeping result of ``tier``"""
+        if tier not in self._store_keys:
+            self._store_keys[tier] = result_stores(
+                self.session, self.fspath.strpath, self.pylintrc_file, self.message_fields, tier)
+        return self._store_keys[tier]
+
+    def result_stored(self):
+        """Whether the results cache or the shared store has the item result"""
+        return any(key in store for store, key in self._result_stores(self.tier))
+
+    def stored_result(self, tier=None):
+        """Returns the result of the item (or its ``tier``) from the results cache or the shared store.
+
+        The result found in the shared store is copied to the results cache.
+        """
+        return stored_result(self._result_stores(self.tier if tier is None else tier))
+
+    def store_result(self, result, tier=None):
+        """Publish the result of the item (or its ``tier``) to the results cache and the shared store"""
+        store_result(self._result_stores(self.tier if tier is None else tier), result)
 
     def runtest(self):
         """Check the pylint messages to see if any errors were reported."""
+        if self.tier1_failed():
+            pytest.skip('pylint-tier1 failed')
+        result = self.stored_result()
+        if result is None:
+            if self.config.option.pylint_timings:
+                self.lint_timings = {}
+            batch = self.batch or LintBatch([self])
+            result = batch.result(self)
+            self.lint_duration = batch.lint_duration
+            self.store_result(result)
+        if self.tier == 1:
+            self.session.pylint_tier1_results[self.fspath.strpath] = result
+
+        if self.config.option.pylint_report:
+            self.report_messages = report_messages(result, self.message_fields, self.rel_path)
+        reported_errors = format_lint_result(result, self._msg_format, self.message_fields, self.config.option)
+        if reported_errors:
+            raise PyLintException(reported_errors)
+
+    def tier1_failed(self, lint=True):
+        """Whether --pylint-tiers-passed skips this second tier item as the first tier of the file failed.
+
+        The first tier result is the one of the item run in the process or a stored
+        one, the first tier is linted again only if ``lint`` is set.
+        """
+        if self.tier != 2 or self.config.option.pylint_tiers != 'passed':
+            return False
+        path = self.fspath.strpath
+        result = self.session.pylint_tier1_results.get(path)
+        if result is None:
+            result = self.stored_result(1)
+        if result is None:
+            if not lint:
+                return False
+            options = self.reporter_options
+            options['tier'] = 1
+            result = lint_item_files(self, [path], **options)[0][path]
+            self.store_result(result, 1)
+        return bool(result['messages'] or result['omitted'])
+
+    def repr_failure(self, excinfo): # pylint: disable=arguments-differ
+        """Handle any test failures by checkint that they were ours."""
+        if excinfo.errisinstance(PyLintException):
+            return excinfo.value.args[0]
+        return super(PyLintItem, self).repr_failure(excinfo)
+
+    def reportinfo(self):
+        """Generate our test report"""
+        return self.fspath, None, '[{0}] {1}'.format(self.tag, self.rel_path)
+
+
+class PyLintGroupFile(pytest.File):
+    """Node of a linted file argument with --pylint-granularity, the group item of its directory lints it"""
+    # pylint: disable=abstract-method
+    def collect(self):
+        """The file has no items of its own"""
+        return []
+
+
+class PyLintGroupCollector(pytest.File):
+    """Collector of group items of the linted files of a directory with --pylint-granularity"""
+    # pylint: disable=abstract-method
+    def __init__(self, fspath, parent, paths):
+        super(PyLintGroupCollector, self).__init__(fspath, parent)
+        self.paths = paths
+
+    def collect(self):
+        """One item of the directory files or one item of every chunk of them"""
+        if self.config.option.pylint_granularity == 'package':
+            return [PyLintGroupItem('pylint-package', self, self.paths)]
+        chunks = chunk_paths(self.paths, self.config.option.pylint_chunk_size * 1024)
+        return [
+            PyLintGroupItem('pylint-chunk-{0}'.format(number), self, chunk)
+            for number, chunk in enumerate(chunks, 1)
+        ]
+
+
+class PyLintGroupItem(pytest.Item):  # pylint: disable=too-many-instance-attributes
+    """Item linting a group of files with single pylint check, failures of the files are reported together"""
+    # pylint: disable=no-member,abstract-method
+    def __init__(self, name, parent, paths):
+        super(PyLintGroupItem, self).__init__(name, parent)
+        self.add_marker('pylint')
+        self._nodeid = '{0}[{1}]'.format(parent.nodeid or '.', name)
+        self.paths = [path.strpath for path in paths]
+        self.rel_path = get_rel_path(parent.fspath.strpath, self.session.fspath.strpath) or '.'
+        self._msg_format, self.pylintrc_file = lint_item_settings(self.session)
+        self.message_fields = message_fields(self._msg_format, report_fields(self.config))
+        self.lint_duration = None
+        self.lint_timings = None
+        self.report_messages = None
+        self._stores = None
+        self._pending = None
+
+    @property
+    def reporter_options(self):
+        """Options of ``ProgrammaticReporter`` collecting messages of the files"""
+        return {
+            'fields': self.message_fields,
+            'max_messages': self.config.option.pylint_max_messages,
+            'fail_fast': self.config.option.pylint_fail_fast,
+            'tier': 0,
+        }
+
+    def result_stores(self):
+        """``result_stores`` of every file of the item by its path"""
+        if self._stores is None:
+            self._stores = {
+                path: result_stores(self.session, path, self.pylintrc_file, self.message_fields)
+                for path in self.paths
+            }
+        return self._stores
+
+    def submit(self, pool):
+        """Start linting the files without stored result in the ``--pylint-jobs`` pool"""
+        stores = self.result_stores()
+        paths = [path for path in self.paths if not any(key in store for store, key in stores[path])]
+        if paths:
+            self._pending = submit_lint(pool, paths, self)
+
+    def runtest(self):
+        """Lint the files without stored result, fail with the messages of all files"""
+        stores = self.result_stores()
+        results = {path: stored_result(stores[path]) for path in self.paths}
+        missing = [path for path in self.paths if results[path] is None]
+        if missing:
+            if self.config.option.pylint_timings:
+                self.lint_timings = {}
+            lint_result = self._pending.get() if self._pending is not None else None
+            self._pending = None
+            # The files with stored result are not submitted, the result of a file could be lost meanwhile
+            if lint_result is None or not set(missing).issubset(lint_result[0]):
+                lint_result = lint_item_files(self, missing, self.lint_timings is not None, **self.reporter_options)
+            lint_results, self.lint_duration, timings = lint_result
+            if self.lint_timings is not None and timings:
+                self.lint_timings.update(timings)
+            for path in missing:
+                results[path] = lint_results[path]
+                store_result(stores[path], results[path])
+
+        rootdir = str(self.config.rootdir)
         reported_errors = []
-        reporter = ProgrammaticReporter()
-        args_list = [self.fspath.strpath]
-
-        if self.pylintrc_file:
-            args_list.append('--rcfile={0}'.format(self.pylintrc_file))
-        result = lint.Run(args_list, reporter=reporter, do_exit=False)
-
-        errors = result.linter.reporter.data
-        for error in errors:
-            reported_errors.append(
-                error.format(self._msg_format)
-            )
+        if self.config.option.pylint_report:
+            self.report_messages = []
+        for path in self.paths:
+            rel_path = get_rel_path(path, rootdir)
+            if self.report_messages is not None:
+                self.report_messages.extend(report_messages(results[path], self.message_fields, rel_path))
+            report = format_lint_result(results[path], self._msg_format, self.message_fields, self.config.option)
+            if report:
+                reported_errors.extend('{0}: {1}'.format(rel_path, line) for line in report.split('\n'))
         if reported_errors:
             raise PyLintException('\n'.join(reported_errors))
 
@@ -233,11 +2178,96 @@ class PyLintItem(pytest.Item, pytest.File):
         """Handle any test failures by checkint that they were ours."""
         if excinfo.errisinstance(PyLintException):
             return excinfo.value.args[0]
-        return super(PyLintItem, self).repr_failure(excinfo)
+        return super(PyLintGroupItem, self).repr_failure(excinfo)
 
     def reportinfo(self):
         """Generate our test report"""
-        return self.fspath, None, '[pylint] {0}'.format(self.rel_path)
+        return self.fspath, None, '[{0}] {1} ({2} files)'.format(self.name, self.rel_path, len(self.paths))
+
+
+class PyLintTier2Item(PyLintItem):  # pylint: disable=abstract-method
+    """Second tier pylint item, pytest collects only one node of a class for a file"""
+
+
+class DuplicateCodeItem(pytest.Item, pytest.File):
+    """Item reporting code of the file duplicated in other linted files"""
+    # pylint: disable=no-member,abstract-method
+    def __init__(self, fspath, parent):
+        super(DuplicateCodeItem, self).__init__(fspath, parent)
+        self.add_marker('pylint')
+        self._nodeid = self.nodeid + DUPLICATES_NODEID_SUFFIX
+        self.rel_path = get_rel_path(fspath.strpath, parent.session.fspath.strpath)
+        self.report_messages = None
+
+    def runtest(self):
+        """Check the index of the session for blocks of the file found in other files"""
+        index = session_duplicate_index(self.session)
+        rootdir = str(self.config.rootdir)
+        duplicates = [
+            (start, end, '{0}:{1}-{2}'.format(get_rel_path(other_path, rootdir), other_start, other_end))
+            for start, end, other_path, other_start, other_end in index.duplicates(self.fspath.strpath)
+        ]
+        if self.config.option.pylint_report:
+            path = self.rel_path.replace(sep, '/')
+            self.report_messages = [
+                {'path': path, 'msg_id': 'R0801', 'symbol': 'duplicate-code', 'category': 'refactor',
+                 'msg': 'Similar lines in {0}'.format(other), 'line': start, 'column': 0}
+                for start, _, other in duplicates
+            ]
+        reported_errors = [
+            'Similar lines {0}-{1} in {2} (duplicate-code)'.format(start, end, other)
+            for start, end, other in duplicates
+        ]
+        if reported_errors:
+            raise PyLintException('\n'.join(reported_errors))
+
+    def repr_failure(self, excinfo): # pylint: disable=arguments-differ
+        """Handle any test failures by checkint that they were ours."""
+        if excinfo.errisinstance(PyLintException):
+            return excinfo.value.args[0]
+        return super(DuplicateCodeItem, self).repr_failure(excinfo)
+
+    def reportinfo(self):
+        """Generate our test report"""
+        return self.fspath, None, '[pylint-duplicates] {0}'.format(self.rel_path)
+
+
+def session_duplicate_index(session):
+    """Returns the duplicate index of the session, the collected files are added on the first call"""
+    index = session.pylint_duplicate_index
+    if not index.collected:
+        index.collected = True
+        index.add([item.fspath.strpath for item in session.items if isinstance(item, DuplicateCodeItem)])
+    return index
+
+
+def duplicate_settings(session):
+    """``DuplicateIndex`` settings of pylintrc ``SIMILARITIES`` section"""
+    settings = {}
+    if session.pylint_config is not None:
+        for option, get in (('min-similarity-lines', 'getint'), ('ignore-comments', 'getboolean'),
+                            ('ignore-docstrings', 'getboolean'), ('ignore-imports', 'getboolean'),
+                            ('ignore-signatures', 'getboolean')):
+            try:
+                settings[option.replace('-', '_')] = getattr(session.pylint_config, get)('SIMILARITIES', option)
+            except (NoSectionError, NoOptionError):
+                pass
+    if 'min_similarity_lines' in settings:
+        settings['min_lines'] = settings.pop('min_similarity_lines')
+    return settings
+
+
+def _vcs_options(config, scm):
+    """Keyword arguments of ``get_mod_files`` of the VCS module given by command line options"""
+    options = {}
+    if config.option.pylint_vcs_since:
+        options['since'] = config.option.pylint_vcs_since
+    if scm.__name__ == 'svn':
+        options['working_copy'] = config.option.pylint_vcs_working_copy
+        if config.option.pylint_vcs_since and getattr(config, 'cache', None) is not None:
+            # Only long ranges are worth of the additional svn info call resolving the revisions
+            options['cache_dir'] = config.cache.makedir('pylint-svn').strpath
+    return options
 
 
 def _get_vcs_root(path):
@@ -246,7 +2276,7 @@ def _get_vcs_root(path):
       A tuple containing the vcs module to use (svn, git) and the root of the
       repository. If repository is unidentified,  then (None, None) is returned.
     """
-    for vcs in SCM_LIST:
+    for vcs in map(importlib.import_module, SCM_LIST):
         repo_root = vcs.repository_root(path)
         if repo_root:
             return vcs, repo_root
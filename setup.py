@@ -3,7 +3,8 @@
 from setuptools import setup
 
 
-INSTALL_REQS = ['six', 'pylint']
+# pylint 3 drops the ``IReporter`` interface of the reporter
+INSTALL_REQS = ['six', 'pylint<3']
 
 
 setup(
@@ -13,7 +14,7 @@ setup(
     platforms=['linux'],
     use_scm_version={'write_to': '_version.py'},
     url='%doc% link',
-    py_modules=['pytest_pylint_xdist_vcs', 'svn'],
+    py_modules=['pytest_pylint_xdist_vcs', 'pylint_engine', 'lint_daemon', 'lint_messages', 'svn', 'git'],
     entry_points={'pytest11': ['pylint = pytest_pylint_xdist_vcs']},
     install_requires=INSTALL_REQS,
     setup_requires=['pytest-runner', 'setuptools_scm', 'setuptools>=24.2.0', 'pip>=9.0.0'],
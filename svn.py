@@ -1,12 +1,20 @@
 """Functions to get information from svn."""
+import hashlib
+import io
+import json
 import logging
 import os.path
 import re
 import subprocess
+import tempfile
+from xml.etree import ElementTree
 
 
 LOG = logging.getLogger('pytest_pylint_xdist_vcs')
 
+# Items of ``svn diff --summarize`` and ``svn status`` of files left to lint
+CHANGED_ITEMS = frozenset(('added', 'modified', 'replaced'))
+
 
 def repository_root(path,):
     """Returns the root of the repository as an absolute path."""
@@ -21,17 +29,131 @@ def repository_root(path,):
     return None
 
 
-def get_mod_files(root):
-    """Returns a list of files that has been modified since the last commit.
+def get_mod_files(root, since=None, working_copy=False, cache_dir=None):
+    """Returns a list of files that has been modified in the ``since:COMMITTED`` revision range.
+    Without ``since`` the range is the last commit (``PREV:COMMITTED``). The working
+    copy changes are summarized by the same ``svn diff`` call. Files of a range of
+    committed revisions never change, with ``cache_dir`` they are stored there and
+    a later call only resolves the revisions with local ``svn info`` (and gets the
+    working copy changes with local ``svn status``).
     Args:
       root: string representing rootpath of the repository, it has to be an absolute path.
+      since: revision (number, keyword or {date}) the range starts at.
+      working_copy: whether local changes of the working copy are included.
+      cache_dir: directory keeping files of ranges of resolved revision numbers.
     Returns: a list with unique modified py files
+    Raises: ValueError if svn fails to summarize the changes since the given ``since`` revision.
     """
     assert os.path.isabs(root), "Root has to be absolute, got: %s" % root
 
-    svn_status_output = subprocess.check_output('svn diff --summarize -r PREV:COMMITTED ' + root, shell=True).decode()
-    filtered_paths = list(filter_lines(svn_status_output, r'^\s*[ AM]+\s+([\/\w\- ]+\.py)$'))
-    return filtered_paths
+    try:
+        return _get_mod_files(root, since, working_copy, cache_dir)
+    except subprocess.CalledProcessError as error:
+        if since:
+            raise ValueError('Svn revision {0} not found: svn exited with status {1}'.format(since, error.returncode))
+        raise
+
+
+def _get_mod_files(root, since, working_copy, cache_dir):
+    """``get_mod_files`` of the range, the svn errors are raised as they are"""
+    memo_path = _range_memo_path(root, since, cache_dir) if cache_dir else None
+    paths = _load_range(root, memo_path) if memo_path else None
+    if paths is not None:
+        if working_copy:
+            paths.extend(_status_paths(root))
+    elif working_copy and not memo_path:
+        # Comparing the revision with the working copy covers the range and the local changes at once
+        paths = _diff_paths(root, since or 'PREV')
+    else:
+        paths = _diff_paths(root, '{0}:COMMITTED'.format(since or 'PREV'))
+        if memo_path:
+            _store_range(root, memo_path, paths)
+        if working_copy:
+            paths.extend(_status_paths(root))
+    return list(dict.fromkeys(paths))
+
+
+def _diff_paths(root, revisions):
+    """Returns py files added, modified or replaced in the ``svn diff`` of the revisions"""
+    output = subprocess.check_output(['svn', 'diff', '--summarize', '--xml', '-r', revisions, root])
+    return [
+        element.text for element in iter_elements(output, 'path')
+        if element.get('kind') == 'file' and element.get('item') in CHANGED_ITEMS and element.text.endswith('.py')
+    ]
+
+
+def _status_paths(root):
+    """Returns py files added, modified or replaced in the working copy"""
+    output = subprocess.check_output(['svn', 'status', '--xml', root])
+    paths = []
+    for entry in iter_elements(output, 'entry'):
+        status = entry.find('wc-status')
+        path = entry.get('path')
+        if status is not None and status.get('item') in CHANGED_ITEMS and path.endswith('.py'):
+            paths.append(path)
+    return paths
+
+
+def _range_memo_path(root, since, cache_dir):
+    """Path of the file keeping files of the revision range resolved to numbers by ``svn info``,
+    None if the range does not resolve to numbers locally"""
+    output = subprocess.check_output(['svn', 'info', '--xml', root])
+    try:
+        entry = next(iter_elements(output, 'entry'), None)
+    except ElementTree.ParseError:
+        LOG.warning('Svn info of %s is not readable, files changed since %s are not memoized', root, since)
+        return None
+    if entry is None:
+        return None
+    commit = entry.find('commit')
+    committed = int(commit.get('revision')) if commit is not None else None
+    revisions = {
+        'PREV': committed - 1 if committed else None,
+        'COMMITTED': committed,
+        'BASE': int(entry.get('revision', 0)) or None,
+    }
+    start = since or 'PREV'
+    start = int(start) if start.isdigit() else revisions.get(start.upper())
+    if start is None or committed is None:
+        return None
+    digest = hashlib.sha1('\0'.join((
+        entry.findtext('repository/uuid', ''), entry.findtext('url', ''), str(start), str(committed),
+    )).encode())
+    return os.path.join(cache_dir, 'svn-{0}.json'.format(digest.hexdigest()))
+
+
+def _load_range(root, memo_path):
+    """Returns files of the memoized range, None if it is not memoized"""
+    try:
+        with open(memo_path) as memo:
+            return [os.path.join(root, path) for path in json.load(memo)]
+    except (OSError, ValueError):
+        return None
+
+
+def _store_range(root, memo_path, paths):
+    """Memoize files of the range relative to the root, written atomically for concurrent sessions"""
+    file_descriptor, tmp_path = tempfile.mkstemp(dir=os.path.dirname(memo_path), suffix='.tmp')
+    try:
+        with os.fdopen(file_descriptor, 'w') as memo:
+            json.dump([os.path.relpath(path, root) for path in paths], memo)
+        os.replace(tmp_path, memo_path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def iter_elements(output, tag):
+    """Yields ``tag`` elements of svn ``--xml`` output as they are parsed, dropping the parsed ones.
+    Args:
+      output: bytes of the XML document.
+      tag: string: name of the elements to yield.
+    Returns: iterator of the elements, complete with their children.
+    """
+    for _, element in ElementTree.iterparse(io.BytesIO(output)):
+        if element.tag == tag:
+            yield element
+            element.clear()
 
 
 def filter_lines(lines, regex):
@@ -0,0 +1,83 @@
+"""Testing module for git module functions"""
+import os
+import subprocess
+
+import pytest
+
+import git
+
+
+def run_git(repo, *args):
+    """Run git command in the repository"""
+    subprocess.check_call(['git', '-C', str(repo)] + list(args), stdout=subprocess.DEVNULL)
+
+
+@pytest.fixture
+def git_repo(tmpdir, monkeypatch):
+    """Fixture providing throwaway git repository with a committed python file"""
+    for variable in ('GIT_AUTHOR_NAME', 'GIT_COMMITTER_NAME'):
+        monkeypatch.setenv(variable, 'tester')
+    for variable in ('GIT_AUTHOR_EMAIL', 'GIT_COMMITTER_EMAIL'):
+        monkeypatch.setenv(variable, 'tester@example.com')
+    repo = tmpdir.mkdir('repo')
+    run_git(repo, 'init', '-q')
+    for path in ('unchanged.py', 'modified.py', 'deleted.py', 'edited.py'):
+        repo.join(path).write('"""Module"""\n')
+    run_git(repo, 'add', '.')
+    run_git(repo, 'commit', '-q', '-m', 'initial')
+    return repo
+
+
+def test_repository_root(git_repo): # pylint: disable=redefined-outer-name
+    """This tests git module getting repository top level directory from any of its subdirectories"""
+    subdir = git_repo.mkdir('sub')
+    assert git.repository_root(str(subdir)) == str(git_repo)
+
+
+def test_no_repository_root(tmpdir):
+    """This tests git module returns no root outside of repository"""
+    assert git.repository_root(str(tmpdir)) is None
+
+
+def test_changed_filepaths_generation(git_repo): # pylint: disable=redefined-outer-name
+    """This tests collecting py files of the last commit, the index, the working tree and not ignored untracked ones"""
+    git_repo.join('modified.py').write('"""Modified module"""\n')
+    git_repo.mkdir('dir with spaces').join('added in commit.py').write('"""Module"""\n')
+    git_repo.join('added.txt').write('not python')
+    git_repo.join('deleted.py').remove()
+    run_git(git_repo, 'add', '-A')
+    run_git(git_repo, 'commit', '-q', '-m', 'second')
+    git_repo.join('staged.py').write('"""Module"""\n')
+    run_git(git_repo, 'add', 'staged.py')
+    git_repo.join('edited.py').write('"""Edited module"""\n')
+    git_repo.join('untracked.py').write('"""Module"""\n')
+    git_repo.mkdir('new').join('untracked.py').write('"""Module"""\n')
+    git_repo.join('ignored.py').write('"""Module"""\n')
+    git_repo.join('.gitignore').write('ignored.py\n')
+
+    paths = git.get_mod_files(str(git_repo))
+    assert sorted(paths) == sorted(os.path.join(str(git_repo), path) for path in (
+        'modified.py', os.path.join('dir with spaces', 'added in commit.py'), 'staged.py', 'edited.py',
+        'untracked.py', os.path.join('new', 'untracked.py')))
+
+
+def test_changed_filepaths_since(git_repo): # pylint: disable=redefined-outer-name
+    """This tests collecting py files changed since given commit"""
+    for path in ('first.py', 'second.py'):
+        git_repo.join(path).write('"""Module"""\n')
+        run_git(git_repo, 'add', path)
+        run_git(git_repo, 'commit', '-q', '-m', path)
+    paths = git.get_mod_files(str(git_repo), since='HEAD~2')
+    assert sorted(paths) == [str(git_repo.join('first.py')), str(git_repo.join('second.py'))]
+
+
+def test_changed_filepaths_of_root_commit(git_repo): # pylint: disable=redefined-outer-name
+    """This tests all tracked files of the only commit are changed"""
+    paths = git.get_mod_files(str(git_repo))
+    assert len(paths) == 4
+
+
+def test_changed_filepaths_since_unknown_commit(git_repo): # pylint: disable=redefined-outer-name
+    """This tests explicitly given commit which is not found is an error, not all tracked files"""
+    with pytest.raises(ValueError, match='Git revision no-such-ref not found'):
+        git.get_mod_files(str(git_repo), since='no-such-ref')
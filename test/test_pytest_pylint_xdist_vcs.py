@@ -1,12 +1,21 @@
 # -*- coding: utf-8 -*-
 """Testing module for plugin"""
+# pylint: disable=too-many-lines
+import json
+import multiprocessing
 import os
+import re
+import resource
+import socket
 from unittest.mock import patch
 import subprocess
+import time
 
 import pytest
 from pytest import ExitCode
 import py
+# pytester drops modules imported by in-process runs, imported here pylint and astroid stay warm for all of them
+import pylint_engine  # pylint: disable=unused-import
 
 
 pytest_plugins = ('pytester',)  # pylint: disable=invalid-name
@@ -37,16 +46,34 @@ Last Changed Date: 2019-04-11 16:35:43 +0200 (Thu, 11 Apr 2019)
 '''.format(MOCKED_REPO_LOCAL_PATH) # svn info output format of 1.7
 
 
+def svn_diff_xml(summary):
+    """Convert ``svn diff --summarize`` text output into its ``--xml`` form"""
+    items = {'M': 'modified', 'A': 'added', 'D': 'deleted', 'R': 'replaced', ' ': 'none'}
+    paths = []
+    for line in summary.splitlines():
+        match = re.match(r'^([MADR ])([M ])\s+(.*)$', line)
+        if match:
+            item, props, path = match.groups()
+            paths.append('<path item="{0}" props="{1}" kind="{2}">{3}</path>'.format(
+                items[item], 'modified' if props == 'M' else 'none',
+                'file' if '.' in os.path.basename(path) else 'dir', path))
+    return '<?xml version="1.0" encoding="UTF-8"?>\n<diff>\n<paths>\n{0}\n</paths>\n</diff>\n'.format(
+        '\n'.join(paths))
+
+
 def mock_svn_console_command(*args, **kwargs): # pylint: disable=inconsistent-return-statements
     """This mocks svn terminal command based on parameters (status, info, etc)"""
-    command = args[0].split()
+    command = args[0] if isinstance(args[0], list) else args[0].split()
+    if command[0] == 'git':
+        # the tests run inside a git repository, which has to stay undetected
+        raise subprocess.CalledProcessError(128, command)
     if command[0] == 'svn':
         if command[1] == 'info': # pylint: disable=no-else-return
             global SVN_INFO_OUTPUT
             return SVN_INFO_OUTPUT.encode()
         elif command[1] == 'diff':
             global SVN_STATUS_OUTPUT
-            return SVN_STATUS_OUTPUT.encode()
+            return svn_diff_xml(SVN_STATUS_OUTPUT).encode()
     else:
         subprocess.check_output(*args, **kwargs)
 
@@ -90,6 +117,16 @@ A       {}/python_package/test_file_one.py
     SVN_STATUS_OUTPUT = _svn_status_output
 
 
+@pytest.fixture
+def added_nested_file_svn_status():
+    """Fixture providing output for svn status mock with added py file in subfolder"""
+    global SVN_STATUS_OUTPUT
+    _svn_status_output = '''
+A       {}/python_package/some_folder/test_file_two.py
+'''.format(MOCKED_REPO_LOCAL_PATH)
+    SVN_STATUS_OUTPUT = _svn_status_output
+
+
 @pytest.fixture
 def modified_file_svn_status():
     """Fixture providing output for svn status mock with modified py file"""
@@ -145,6 +182,21 @@ def test_basic(testdir):
     assert '1 failed' in result.stdout.str()
 
 
+def test_lazy_imports(testdir):
+    """pylint, astroid and VCS modules are imported only when linting is enabled"""
+    testdir.makeconftest("""
+import sys
+
+def pytest_sessionfinish():
+    print('imported:', ' '.join(name for name in ('pylint', 'astroid', 'svn', 'git') if name in sys.modules) or '-')
+""")
+    testdir.makepyfile('"""Module"""\n')
+    result = testdir.runpytest_subprocess('-s', '-p', 'no:cacheprovider')
+    result.stdout.fnmatch_lines(['*imported: -'])
+    result = testdir.runpytest_subprocess('-s', '-p', 'no:cacheprovider', '--pylint')
+    result.stdout.fnmatch_lines(['*imported: pylint astroid'])
+
+
 def test_subdirectories(testdir):
     """Verify pylint checks files in subdirectories"""
     subdir = testdir.mkpydir('mymodule')
@@ -237,6 +289,785 @@ msg-template=start {msg_id} end
     assert 'start W0611 end' in result.stdout.str()
 
 
+def test_pylintrc_msg_template_end_position(testdir):
+    """Verify that msg-template fields beyond the default ones are recorded from the installed pylint."""
+    import pylint  # pylint: disable=import-outside-toplevel
+    rcfile = testdir.makefile('rc', """
+[REPORTS]
+
+msg-template={path}:{line}-{end_line}: {msg_id}
+""")
+    testdir.makepyfile('import sys')
+    result = testdir.runpytest(
+        '--pylint', '--pylint-rcfile={0}'.format(rcfile.strpath)
+    )
+    # pylint 2.12 and later messages have the end position
+    end_line = '1' if tuple(int(part) for part in pylint.__version__.split('.')[:2]) >= (2, 12) else 'None'
+    result.stdout.fnmatch_lines(['*.py:1-{0}: W0611'.format(end_line)])
+
+
+def test_max_messages(testdir):
+    """Messages over the limit are counted, the limit is part of cached result key"""
+    testdir.tmpdir.join('imports.py').write('"""Unused imports"""\nimport os\nimport re\nimport sys\nimport json\n')
+    result = testdir.runpytest('--pylint', '--pylint-max-messages=2')
+    assert result.stdout.str().count('Unused import') == 2
+    result.stdout.fnmatch_lines(['... 2 more messages not reported (--pylint-max-messages=2)'])
+
+    result = testdir.runpytest('--pylint')
+    assert result.stdout.str().count('Unused import') == 4
+    assert 'more messages not reported' not in result.stdout.str()
+
+
+class TestFailFast:
+    """Tests related to --pylint-fail-fast mode"""
+
+    @staticmethod
+    @pytest.fixture
+    def failing_files(testdir):
+        """Fixture creating file with errors and file with warning only"""
+        testdir.tmpdir.join('errors.py').write(
+            '"""Errors"""\nimport sys\nundefined_function()\nUNDEFINED_CONSTANT = undefined_value\n')
+        testdir.tmpdir.join('warning.py').write('"""Warning"""\nimport os\n')
+
+    @staticmethod
+    def test_stop_on_first_error(testdir, failing_files): # pylint: disable=unused-argument
+        """File is reported with its first error, a file without errors is linted fully"""
+        result = testdir.runpytest('--pylint', '--pylint-fail-fast-category=error')
+        result.assert_outcomes(failed=2)
+        output = result.stdout.str()
+        assert "Undefined variable 'undefined_function'" in output
+        assert 'undefined_value' not in output
+        assert 'Unused import sys' not in output
+        assert 'Unused import os' in output
+        assert output.count('linting stopped at the first error message (--pylint-fail-fast)') == 1
+
+    @staticmethod
+    def test_batch_continues_after_aborted_file(testdir, failing_files): # pylint: disable=unused-argument
+        """Files after the aborted one are linted by the same warm linter"""
+        from pylint_engine import LintRun  # pylint: disable=import-outside-toplevel
+        with patch('pylint_engine.LintRun', wraps=LintRun) as run_mock:
+            result = testdir.runpytest('--pylint', '--pylint-fail-fast', '--pylint-batch-size=2')
+        assert run_mock.call_count == 1
+        result.assert_outcomes(failed=2)
+        output = result.stdout.str()
+        assert output.count('linting stopped at the first message (--pylint-fail-fast)') == 2
+        assert 'Unused import' not in output
+
+    @staticmethod
+    def test_flag_before_path(testdir, failing_files): # pylint: disable=unused-argument
+        """The flag takes no value, a path after it is a file argument (as with the flag in addopts)"""
+        result = testdir.runpytest('--pylint', '--pylint-fail-fast', 'warning.py')
+        result.assert_outcomes(failed=1)
+        result.stdout.fnmatch_lines(['... linting stopped at the first message (--pylint-fail-fast)'])
+
+
+class TestTiers:
+    """Tests related to --pylint-tiers two pass linting"""
+
+    @staticmethod
+    @pytest.fixture
+    def tiered_files(testdir):
+        """Fixture creating files failing each tier or only the second one"""
+        testdir.tmpdir.join('both.py').write('"""Both tiers"""\nimport os\nVALUE = "text"()\n')
+        testdir.tmpdir.join('inference.py').write('"""Second tier"""\nVALUE = "text"()\n')
+
+    @staticmethod
+    def test_tiers(testdir, tiered_files): # pylint: disable=unused-argument
+        """First tier of every file runs before the second, each reports messages of its checkers"""
+        result = testdir.runpytest('--pylint', '--pylint-tiers', '-v')
+        result.assert_outcomes(passed=1, failed=3)
+        result.stdout.re_match_lines([
+            r'both\.py\[pylint-tier1\] FAILED',
+            r'inference\.py\[pylint-tier1\] PASSED',
+            r'both\.py\[pylint-tier2\] FAILED',
+            r'inference\.py\[pylint-tier2\] FAILED',
+        ])
+        result.stdout.re_match_lines([r'_+ \[pylint-tier1\] both\.py _+', r'.*Unused import os',
+                                      r'_+ \[pylint-tier2\] both\.py _+', r".*is not callable"])
+        assert result.stdout.str().count('Unused import os') == 1
+
+    @staticmethod
+    def test_second_tier_of_passed(testdir, tiered_files): # pylint: disable=unused-argument
+        """Second tier is skipped for the files failing the first one"""
+        result = testdir.runpytest('--pylint', '--pylint-tiers-passed', '-rs')
+        result.assert_outcomes(passed=1, failed=2, skipped=1)
+        result.stdout.fnmatch_lines(['SKIPPED * pylint-tier1 failed'])
+
+    @staticmethod
+    def test_second_tier_of_passed_without_cache(testdir, tiered_files): # pylint: disable=unused-argument
+        """First tier results of the process are reused, failing files are not linted by the second tier"""
+        from pylint_engine import run_pylint  # pylint: disable=import-outside-toplevel
+        with patch('pylint_engine.run_pylint', wraps=run_pylint) as run_mock:
+            result = testdir.runpytest('--pylint', '--pylint-no-cache', '--pylint-batch-size=2',
+                                       '--pylint-tiers-passed')
+        result.assert_outcomes(passed=1, failed=2, skipped=1)
+        linted = [(call[0][1].tier, sorted(os.path.basename(path) for path in call[0][0]))
+                  for call in run_mock.call_args_list]
+        assert linted == [(1, ['both.py', 'inference.py']), (2, ['inference.py'])]
+
+    @staticmethod
+    def test_flag_before_path(testdir):
+        """The flag takes no value, a path after it is a file argument"""
+        testdir.tmpdir.join('clean.py').write('"""Clean"""\n')
+        result = testdir.runpytest('--pylint', '--pylint-tiers', 'clean.py')
+        result.assert_outcomes(passed=2)
+
+    @staticmethod
+    def test_tier_batches_w_xdist(testdir, tiered_files): # pylint: disable=unused-argument
+        """Batches of distributed items hold the items of one tier"""
+        result = testdir.runpytest('--pylint', '--pylint-tiers', '--pylint-batch-size=2', '-n=2', '-v')
+        result.stdout.fnmatch_lines(['scheduling tests via PyLintScheduling'])
+        result.assert_outcomes(passed=1, failed=3)
+
+
+class TestDuplicates:
+    """Tests related to --pylint-duplicates detection of code duplicated across files"""
+
+    BLOCK = ''.join('    total += value * {0}\n'.format(index) for index in range(6))
+
+    @classmethod
+    @pytest.fixture
+    def duplicated_files(cls, testdir):
+        """Fixture creating two files sharing a block of code and a file without it"""
+        for name in ('first', 'second'):
+            source = '"""Module {0}"""\n\n\ndef {0}(value):\n    """Function"""\n    total = 0\n'.format(name)
+            testdir.tmpdir.join('{0}.py'.format(name)).write(source + cls.BLOCK + '    return total\n')
+        testdir.tmpdir.join('other.py').write('"""Other"""\nVALUE = 1\n')
+
+    @staticmethod
+    def test_duplicates(testdir, duplicated_files): # pylint: disable=unused-argument
+        """Files sharing a block report each other, the other file passes"""
+        result = testdir.runpytest('--pylint', '--pylint-duplicates', '-v')
+        result.stdout.re_match_lines([
+            r'first\.py\[pylint-duplicates\] FAILED',
+            r'other\.py\[pylint-duplicates\] PASSED',
+            r'second\.py\[pylint-duplicates\] FAILED',
+        ])
+        result.stdout.fnmatch_lines(['Similar lines 6-13 in second.py:6-13 (duplicate-code)'])
+
+    @staticmethod
+    def indexed_files(testdir):
+        """Number of stored file entries and names of the files listed in the stored window buckets"""
+        directory = testdir.parseconfigure().cache.makedir('pylint-duplicates')
+        entries = {'files': [], 'windows': []}
+        for entry in directory.visit('*.json'):
+            entries[entry.dirpath().basename].append(entry)
+        names = {
+            os.path.basename(path)
+            for bucket in entries['windows'] for paths in json.loads(bucket.read()).values() for path in paths
+        }
+        return len(entries['files']), sorted(names)
+
+    @staticmethod
+    def test_index_updated_for_changed_files(testdir, duplicated_files): # pylint: disable=unused-argument
+        """Index kept between runs is updated with the changed files, entries of removed files are dropped
+        when a checked file matches them"""
+        from pytest_pylint_xdist_vcs import file_windows  # pylint: disable=import-outside-toplevel
+        testdir.runpytest('--pylint', '--pylint-duplicates')
+        assert TestDuplicates.indexed_files(testdir) == (3, ['first.py', 'second.py'])
+
+        testdir.tmpdir.join('second.py').write('"""Second"""\nVALUE = 2\n')
+        result = testdir.runpytest('--pylint', '--pylint-duplicates')
+        result.assert_outcomes(passed=6)
+        assert TestDuplicates.indexed_files(testdir) == (3, ['first.py'])
+
+        testdir.tmpdir.join('fourth.py').write(testdir.tmpdir.join('first.py').read())
+        testdir.tmpdir.join('first.py').remove()
+        with patch('pytest_pylint_xdist_vcs.file_windows', wraps=file_windows) as windows_mock:
+            result = testdir.runpytest('--pylint', '--pylint-duplicates', 'fourth.py')
+        result.assert_outcomes(passed=2)
+        assert [os.path.basename(call[0][0]) for call in windows_mock.call_args_list] == ['fourth.py']
+        assert TestDuplicates.indexed_files(testdir) == (3, ['fourth.py'])
+
+
+    @staticmethod
+    def test_index_updated_for_files_not_collected(testdir, duplicated_files): # pylint: disable=unused-argument
+        """Indexed file changed since is indexed again even if it is not collected"""
+        testdir.runpytest('--pylint', '--pylint-duplicates')
+        testdir.tmpdir.join('second.py').write('"""Second"""\nVALUE = 2\n')
+        result = testdir.runpytest('--pylint', '--pylint-duplicates', 'first.py')
+        result.assert_outcomes(passed=2)
+
+    @staticmethod
+    def test_index_updated_by_controller_w_xdist(testdir, duplicated_files): # pylint: disable=unused-argument
+        """Workers get the changed entries from the controller, which stores the index"""
+        from pytest_pylint_xdist_vcs import file_windows  # pylint: disable=import-outside-toplevel
+        testdir.runpytest('--pylint', '--pylint-duplicates', '-n=2')
+        assert TestDuplicates.indexed_files(testdir) == (3, ['first.py', 'second.py'])
+
+        testdir.tmpdir.join('second.py').write('"""Second"""\nVALUE = 2\n')
+        testdir.tmpdir.join('third.py').write('"""Third"""\nVALUE = 3\n')
+        with patch('pytest_pylint_xdist_vcs.file_windows', wraps=file_windows) as windows_mock:
+            result = testdir.runpytest('--pylint', '--pylint-duplicates', '-n=2')
+        result.assert_outcomes(passed=8)
+        assert sorted(os.path.basename(call[0][0]) for call in windows_mock.call_args_list) == ['second.py', 'third.py']
+        assert TestDuplicates.indexed_files(testdir) == (4, ['first.py'])
+
+    @staticmethod
+    def test_file_windows_match_similarities(tmpdir):
+        """Windows are numbered by the lines of the file with every supported pylint"""
+        from pytest_pylint_xdist_vcs import file_windows  # pylint: disable=import-outside-toplevel
+        path = tmpdir.join('module.py')
+        path.write('"""Module"""\n\n' + ''.join('VALUE_{0} = {0}\n'.format(index) for index in range(6)))
+        windows = file_windows(str(path), min_lines=4)
+        assert [window[1:] for window in windows] == [[3, 6], [4, 7], [5, 8]]
+
+class TestWatch:
+    """Tests related to --pylint-watch relinting of changed files"""
+
+    @staticmethod
+    def test_relint_changed_file_and_importers(testdir):
+        """Changed file and the files importing it are relinted with astroid module of the file built again"""
+        from pytest_pylint_xdist_vcs import LintWatcher  # pylint: disable=import-outside-toplevel
+        package = testdir.mkpydir('package')
+        package.join('base.py').write('"""Base"""\n\n\ndef value():\n    """Value"""\n    return 1\n')
+        package.join('user.py').write('"""User"""\nfrom . import base\n\nVALUE = base.value()\n')
+        package.join('other.py').write('"""Other"""\nVALUE = 1\n')
+
+        calls = []
+
+        def changes(watcher):
+            if calls:
+                raise KeyboardInterrupt()
+            calls.append(watcher)
+            base = package.join('base.py')
+            base.write('"""Base"""\nimport os\n\n\ndef value():\n    """Value"""\n    return 1\n')
+            os.utime(str(base), ns=(0, 0))
+            return LintWatcher.changed_files(watcher, watcher.paths)
+
+        with patch.object(LintWatcher, 'wait_for_changes', autospec=True, side_effect=changes):
+            result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-watch')
+        result.stdout.fnmatch_lines([
+            '*= 4 passed*',
+            'watching 4 files for changes, Ctrl-C to stop',
+            '*?pylint? package/base.py*',
+            '*Unused import os (unused-import)',
+            '?pylint? package/user.py PASSED',
+            '*2 relinted, 1 failed in *',
+        ])
+        assert 'other.py PASSED' not in result.stdout.str()
+
+    @staticmethod
+    def test_imported_modules(testdir):
+        """Absolute and relative imports are resolved to module names"""
+        from pytest_pylint_xdist_vcs import imported_modules  # pylint: disable=import-outside-toplevel
+        package = testdir.mkpydir('package')
+        module = package.join('module.py')
+        module.write('import os.path\nfrom . import sibling\nfrom .sub.deep import name\nfrom .. import top\n')
+        assert imported_modules(str(module)) == {
+            'os', 'os.path', 'package', 'package.sibling', 'package.sub', 'package.sub.deep',
+            'package.sub.deep.name', 'top',
+        }
+
+
+class TestDaemon:
+    """Tests related to --pylint-daemon linting by warm daemon processes"""
+
+    @staticmethod
+    @pytest.fixture
+    def daemon_socket(testdir):
+        """Fixture running the daemon with one process, returns its socket path"""
+        from lint_daemon import serve  # pylint: disable=import-outside-toplevel
+        socket_path = str(testdir.tmpdir.join('daemon.sock'))
+        daemon = multiprocessing.get_context('fork').Process(target=serve, args=(socket_path, 1))
+        daemon.start()
+        for _ in range(100):
+            if os.path.exists(socket_path):
+                break
+            time.sleep(0.05)
+        yield socket_path
+        daemon.terminate()
+        daemon.join()
+        assert not os.path.exists(socket_path)
+
+    @staticmethod
+    def test_lint_by_daemon(testdir, daemon_socket): # pylint: disable=redefined-outer-name
+        """Files are linted by the daemon, the modules changed between sessions are built again"""
+        testdir.tmpdir.join('constants.py').write('"""Constants"""\nVALUE = 1\n')
+        testdir.tmpdir.join('user.py').write('"""User"""\nfrom constants import VALUE\n\nRESULT = VALUE()\n')
+        with patch('pylint_engine.LintRun', side_effect=AssertionError('pylint must not run')):
+            result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-no-cache',
+                                       '--pylint-daemon={0}'.format(daemon_socket))
+            result.assert_outcomes(passed=1, failed=1)
+            result.stdout.fnmatch_lines(['*VALUE is not callable (not-callable)'])
+
+            testdir.tmpdir.join('constants.py').write('"""Constants"""\nVALUE = len\n')
+            result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-no-cache',
+                                       '--pylint-daemon={0}'.format(daemon_socket))
+            result.assert_outcomes(passed=2)
+
+    @staticmethod
+    def test_changed_external_module(testdir, daemon_socket, tmpdir_factory, monkeypatch): # pylint: disable=redefined-outer-name
+        """Module outside rootdir changed after the session it was built in is built again"""
+        external = tmpdir_factory.mktemp('external')
+        external.join('constants.py').write('"""Constants"""\nVALUE = 1\n')
+        monkeypatch.syspath_prepend(str(external))
+        testdir.tmpdir.join('user.py').write('"""User"""\nfrom constants import VALUE\n\nRESULT = VALUE()\n')
+        result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-no-cache',
+                                   '--pylint-daemon={0}'.format(daemon_socket))
+        result.stdout.fnmatch_lines(['*VALUE is not callable (not-callable)'])
+
+        external.join('constants.py').write('"""Constants"""\nVALUE = len\n')
+        result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-no-cache',
+                                   '--pylint-daemon={0}'.format(daemon_socket))
+        result.assert_outcomes(passed=1)
+
+    @staticmethod
+    def test_daemon_not_reachable(testdir, file_with_multiple_tests): # pylint: disable=redefined-outer-name,unused-argument
+        """Files are linted in the process when the daemon does not run"""
+        result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-daemon={0}'.format(
+            testdir.tmpdir.join('missing.sock')))
+        result.assert_outcomes(passed=1, failed=1)
+
+    @staticmethod
+    def test_daemon_not_answering(testdir, file_with_multiple_tests, monkeypatch): # pylint: disable=redefined-outer-name,unused-argument
+        """Files are linted in the process when the daemon does not answer in time"""
+        monkeypatch.setattr('lint_daemon.DAEMON_READ_TIMEOUT', 0.5)
+        socket_path = str(testdir.tmpdir.join('stuck.sock'))
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            # Connections wait in the backlog, the request is never read
+            server.bind(socket_path)
+            server.listen(8)
+            start = time.time()
+            result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-daemon={0}'.format(socket_path))
+        result.assert_outcomes(passed=1, failed=1)
+        assert time.time() - start < 30
+
+
+class TestLimits:
+    """Tests related to --pylint-timeout and --pylint-max-memory supervised linting"""
+
+    @staticmethod
+    @pytest.fixture
+    def pathological_run():
+        """Fixture making pylint of ``slow.py`` endless, ``huge.py`` memory hungry and ``bad.py`` crash"""
+        from pylint_engine import run_pylint  # pylint: disable=import-outside-toplevel
+
+        def run(paths, *args):
+            if any(path.endswith('slow.py') for path in paths):
+                time.sleep(60)
+            if any(path.endswith('huge.py') for path in paths):
+                return [bytearray(1024 * 1024) for _ in range(1024 * 1024)]
+            if any(path.endswith('bad.py') for path in paths):
+                raise ValueError('pylint crashed')
+            return run_pylint(paths, *args)
+
+        with patch('pylint_engine.run_pylint', side_effect=run):
+            yield
+
+    @staticmethod
+    def test_timeout(testdir, pathological_run): # pylint: disable=redefined-outer-name,unused-argument
+        """Only the file breaching the limit of the batch fails"""
+        testdir.tmpdir.join('slow.py').write('"""Slow"""\n')
+        testdir.tmpdir.join('fine.py').write('"""Fine"""\n')
+        result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-timeout=0.5', '--pylint-batch-size=2')
+        result.assert_outcomes(passed=1, failed=1)
+        result.stdout.fnmatch_lines(['*?pylint? slow.py*', 'linting exceeded --pylint-timeout=0.5 seconds'])
+
+    @staticmethod
+    def test_pool_timeout(testdir, pathological_run): # pylint: disable=redefined-outer-name,unused-argument
+        """The limits apply to the files linted by --pylint-jobs pool"""
+        testdir.tmpdir.join('slow.py').write('"""Slow"""\n')
+        testdir.tmpdir.join('fine.py').write('"""Fine"""\n')
+        result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-timeout=0.5', '--pylint-jobs=2')
+        result.assert_outcomes(passed=1, failed=1)
+        result.stdout.fnmatch_lines(['linting exceeded --pylint-timeout=0.5 seconds'])
+
+    @staticmethod
+    def test_max_memory(testdir, pathological_run): # pylint: disable=redefined-outer-name,unused-argument
+        """File running out of memory fails and the limit is not cached"""
+        testdir.tmpdir.join('huge.py').write('"""Huge"""\n')
+        result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-max-memory=50')
+        result.assert_outcomes(failed=1)
+        result.stdout.fnmatch_lines(['linting exceeded --pylint-max-memory=50 MB'])
+        assert not testdir.tmpdir.join('.pytest_cache', 'd', 'pylint').listdir('*.json')
+
+    @staticmethod
+    def test_max_memory_within_hard_limit(testdir):
+        """The child keeps a finite hard limit, which an unprivileged process can not raise"""
+        hard_limit = 64 * 1024 ** 3
+
+        def setrlimit(_, limits):
+            if limits[1] != hard_limit or limits[0] > hard_limit:
+                raise ValueError('not allowed to raise maximum limit')
+
+        testdir.tmpdir.join('fine.py').write('"""Fine"""\n')
+        with patch('resource.getrlimit', return_value=(resource.RLIM_INFINITY, hard_limit)), \
+                patch('resource.setrlimit', side_effect=setrlimit):
+            result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-max-memory=100000')
+        result.assert_outcomes(passed=1)
+
+    @staticmethod
+    def test_child_error(testdir, pathological_run): # pylint: disable=redefined-outer-name,unused-argument
+        """Error of the child is reported with its traceback and not as a breached limit"""
+        testdir.tmpdir.join('bad.py').write('"""Bad"""\n')
+        result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-max-memory=50')
+        result.assert_outcomes(failed=1)
+        result.stdout.fnmatch_lines(['linting in a child process failed:', '*ValueError: pylint crashed'])
+        assert 'linting exceeded' not in result.stdout.str()
+
+    @staticmethod
+    def test_child_forked_warm(testdir):
+        """Linter is configured in the parent once, one child inheriting it lints all files"""
+        from pylint_engine import LintRun  # pylint: disable=import-outside-toplevel
+        testdir.tmpdir.join('first.py').write('"""First"""\nimport os\n')
+        testdir.tmpdir.join('second.py').write('"""Second"""\n')
+        with patch.dict('pylint_engine._WARM_LINTERS', clear=True), \
+                patch('pylint_engine.LintRun', wraps=LintRun) as run_mock, \
+                patch('os.fork', wraps=os.fork) as fork_mock:
+            result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-timeout=30', '--pylint-no-cache')
+        assert run_mock.call_count == 1
+        assert fork_mock.call_count == 1
+        result.assert_outcomes(passed=1, failed=1)
+        result.stdout.fnmatch_lines(['*Unused import os*'])
+
+
+class TestGranularity:
+    """Tests related to --pylint-granularity items of groups of files"""
+
+    @staticmethod
+    @pytest.fixture
+    def package_files(testdir):
+        """Fixture creating a package with two failing files and a passing one and a passing top module"""
+        package = testdir.mkpydir('package')
+        package.join('first.py').write('"""First"""\nimport os\n')
+        package.join('second.py').write('"""Second"""\nimport sys\n')
+        package.join('third.py').write('"""Third"""\n' + '# filler\n' * 300)
+        testdir.tmpdir.join('top.py').write('"""Top"""\n')
+
+    @staticmethod
+    def test_package(testdir, package_files): # pylint: disable=unused-argument
+        """One item per directory reports failures of its files"""
+        result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-granularity=package', '-v')
+        result.assert_outcomes(passed=1, failed=1)
+        result.stdout.re_match_lines([r'\.\[pylint-package\] PASSED', r'package\[pylint-package\] FAILED'])
+        result.stdout.fnmatch_lines([
+            'package/first.py: W:  2, 0: Unused import os (unused-import)',
+            'package/second.py: W:  2, 0: Unused import sys (unused-import)',
+        ])
+        result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-granularity=package')
+        result.assert_outcomes(passed=1, failed=1)
+
+    @staticmethod
+    def test_package_of_file_args(testdir, package_files): # pylint: disable=unused-argument
+        """Group item of a directory lints only the files collected from the session arguments"""
+        result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-granularity=package',
+                                   'package/first.py', 'package/third.py')
+        result.assert_outcomes(failed=1)
+        result.stdout.fnmatch_lines(['package/first.py: W:  2, 0: Unused import os (unused-import)'])
+        assert 'second.py' not in result.stdout.str()
+
+    @staticmethod
+    def test_chunk(testdir, package_files): # pylint: disable=unused-argument
+        """Files of a directory are split into chunks of about the same size"""
+        result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-granularity=chunk',
+                                   '--pylint-chunk-size=2', '-v')
+        result.assert_outcomes(passed=2, failed=1)
+        result.stdout.re_match_lines([
+            r'\.\[pylint-chunk-1\] PASSED',
+            r'package\[pylint-chunk-1\] PASSED',
+            r'package\[pylint-chunk-2\] FAILED',
+        ])
+
+    @staticmethod
+    def test_no_file_items(testdir, package_files): # pylint: disable=unused-argument
+        """Only the group items are built, not an item of every file"""
+        from pytest_pylint_xdist_vcs import PyLintItem  # pylint: disable=import-outside-toplevel
+        with patch.object(PyLintItem, '__init__', side_effect=AssertionError('file item built')):
+            result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-granularity=package')
+        result.assert_outcomes(passed=1, failed=1)
+
+    @staticmethod
+    def test_package_timings_and_durations_w_xdist(testdir, package_files): # pylint: disable=unused-argument
+        """Group items report their time and checkers time, the controller records their durations"""
+        result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-granularity=package', '-n=2',
+                                   '--pylint-timings-json=timings.json')
+        result.assert_outcomes(passed=1, failed=1)
+        timings = json.loads(testdir.tmpdir.join('timings.json').read())
+        assert sorted(timings['files']) == ['.[pylint-package]', 'package[pylint-package]']
+        assert {'astroid', 'typecheck'} <= set(timings['checkers'])
+        durations = json.loads(testdir.tmpdir.join('.pytest_cache', 'v', 'pylint', 'durations').read())
+        assert sorted(durations) == ['.[pylint-package]', 'package[pylint-package]']
+
+    @staticmethod
+    def test_package_in_pool(testdir, package_files): # pylint: disable=unused-argument
+        """Group items report the results of their files linted by the pool"""
+        with patch('pytest_pylint_xdist_vcs.lint_item_files', side_effect=AssertionError('linted in process')):
+            result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-granularity=package',
+                                       '--pylint-jobs=2', '--pylint-no-cache')
+        result.assert_outcomes(passed=1, failed=1)
+
+    @staticmethod
+    def test_package_watch(testdir, package_files): # pylint: disable=unused-argument
+        """The files of group items are watched"""
+        from pytest_pylint_xdist_vcs import LintWatcher  # pylint: disable=import-outside-toplevel
+        with patch.object(LintWatcher, 'wait_for_changes', autospec=True, side_effect=KeyboardInterrupt()):
+            result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-granularity=package', '--pylint-watch')
+        result.stdout.fnmatch_lines(['watching 5 files for changes, Ctrl-C to stop'])
+
+    @staticmethod
+    def test_package_affinity(testdir, package_files): # pylint: disable=unused-argument
+        """Group items keep their files together, affinity scheduling does not apply"""
+        result = testdir.runpytest('--pylint', '--pylint-granularity=package', '--pylint-affinity=package')
+        assert result.ret == ExitCode.USAGE_ERROR
+
+    @staticmethod
+    def test_chunk_paths(tmpdir):
+        """Largest files go to the smallest chunk"""
+        from pytest_pylint_xdist_vcs import chunk_paths  # pylint: disable=import-outside-toplevel
+        paths = []
+        for name, size in [('a', 50), ('b', 40), ('c', 30), ('d', 20), ('e', 10)]:
+            paths.append(tmpdir.join(name + '.py'))
+            paths[-1].write('#' * size)
+        chunks = chunk_paths(paths, 75)
+        assert [[path.basename for path in chunk] for chunk in chunks] == [['a.py', 'd.py', 'e.py'], ['b.py', 'c.py']]
+
+
+def test_warm_linter_reused(testdir, file_with_multiple_tests): # pylint: disable=redefined-outer-name,unused-argument
+    """Linter is configured once per process and each file reports only its own messages"""
+    from pylint_engine import LintRun  # pylint: disable=import-outside-toplevel
+    with patch('pylint_engine.LintRun', wraps=LintRun) as run_mock:
+        result = testdir.runpytest('-m', 'pylint', '--pylint', '--pylint-no-cache')
+    assert run_mock.call_count == 1
+    result.assert_outcomes(passed=1, failed=1)
+    assert 'Unused import sys' in result.stdout.str()
+
+
+def test_warm_linters_cleared(tmpdir):
+    """Linter dropped by ``clear_warm_linters`` is configured again by the next lint"""
+    from pylint_engine import LintRun, ProgrammaticReporter, clear_warm_linters, run_pylint  # pylint: disable=import-outside-toplevel
+    tmpdir.join('module.py').write('"""Module"""\n')
+    paths = [str(tmpdir.join('module.py'))]
+    with patch.dict('pylint_engine._WARM_LINTERS', clear=True), \
+            patch('pylint_engine.LintRun', wraps=LintRun) as run_mock:
+        run_pylint(paths, ProgrammaticReporter())
+        run_pylint(paths, ProgrammaticReporter())
+        assert run_mock.call_count == 1
+        clear_warm_linters()
+        run_pylint(paths, ProgrammaticReporter())
+        assert run_mock.call_count == 2
+
+
+class TestBatchLinting:
+    """Tests related to linting files in batches"""
+
+    @staticmethod
+    @pytest.fixture
+    def batch_files(testdir):
+        """Fixture creating files passing and failing lint"""
+        # makepyfile strips the final newline of the source
+        for name, source in [('first.py', '"""Fine module"""\n'), ('second.py', 'import sys'),
+                             ('third.py', '"""Fine module"""\n'), ('fourth.py', 'import os')]:
+            testdir.tmpdir.join(name).write(source)
+
+    @staticmethod
+    def test_batch_single_check(testdir, batch_files): # pylint: disable=unused-argument
+        """Every batch is linted by single check and messages are split by file"""
+        from pylint import lint  # pylint: disable=import-outside-toplevel
+        with patch.object(lint.PyLinter, 'check', autospec=True, side_effect=lint.PyLinter.check) as check_mock:
+            result = testdir.runpytest('--pylint', '--pylint-no-cache', '--pylint-batch-size=3')
+        assert [len(call[0][1]) for call in check_mock.call_args_list] == [3, 1]
+        result.assert_outcomes(passed=2, failed=2)
+        result.stdout.re_match_lines_random([r'_+ \[pylint\] second\.py _+', r'_+ \[pylint\] fourth\.py _+'])
+        assert result.stdout.str().count('Unused import') == 2
+
+    @staticmethod
+    def test_batch_skips_cached_files(testdir, batch_files): # pylint: disable=unused-argument
+        """Files with cached results are not linted again as part of the batch"""
+        testdir.runpytest('--pylint', 'first.py')
+        from pylint import lint  # pylint: disable=import-outside-toplevel
+        with patch.object(lint.PyLinter, 'check', autospec=True, side_effect=lint.PyLinter.check) as check_mock:
+            result = testdir.runpytest('--pylint', '--pylint-batch-size=4')
+        assert [len(call[0][1]) for call in check_mock.call_args_list] == [3]
+        result.assert_outcomes(passed=2, failed=2)
+
+    @staticmethod
+    def test_batch_without_cross_file_messages(testdir):
+        """Duplicated code of the batch files is not reported under the last file, nor cached for it"""
+        block = ''.join('    total += value * {0}\n'.format(index) for index in range(6))
+        for name in ('first', 'second'):
+            source = '"""Module {0}"""\n\n\ndef {0}(value):\n    """Function"""\n    total = 0\n'.format(name)
+            testdir.tmpdir.join('{0}.py'.format(name)).write(source + block + '    return total\n')
+        testdir.tmpdir.join('third.py').write('"""Fine module"""\n')
+        rcfile = testdir.makefile('rc', '[MESSAGES CONTROL]\nenable=duplicate-code,cyclic-import\n')
+        rcfile_option = '--pylint-rcfile={0}'.format(rcfile.strpath)
+        result = testdir.runpytest('--pylint', '-m', 'pylint', rcfile_option, '--pylint-batch-size=3')
+        result.assert_outcomes(passed=3)
+        result = testdir.runpytest('--pylint', '-m', 'pylint', rcfile_option)
+        result.assert_outcomes(passed=3)
+
+    @staticmethod
+    def test_batch_w_xdist(testdir, batch_files): # pylint: disable=unused-argument
+        """Batches are scheduled to xdist workers as single work units"""
+        result = testdir.runpytest('--pylint', '--pylint-batch-size=2', '-n=2', '-v')
+        result.stdout.fnmatch_lines(['scheduling tests via PyLintScheduling'])
+        result.assert_outcomes(passed=2, failed=2)
+
+
+class TestResultCache:
+    """Tests related to reusing lint results of unchanged files"""
+
+    @staticmethod
+    def test_unchanged_file_not_relinted(testdir):
+        """Messages of the unchanged file are replayed from cache without running pylint"""
+        testdir.makepyfile('import sys')
+        testdir.runpytest('--pylint')
+        with patch('pylint_engine.LintRun', side_effect=AssertionError('pylint must not run')):
+            result = testdir.runpytest('--pylint')
+        assert 'Unused import sys' in result.stdout.str()
+        result.assert_outcomes(failed=1)
+
+    @staticmethod
+    def test_changed_file_relinted(testdir):
+        """Changed content produces a new cache key"""
+        pyfile = testdir.makepyfile('import sys')
+        testdir.runpytest('--pylint')
+        pyfile.write('"""Fixed module"""\n')
+        # astroid keeps the in-process module cache, only a fresh interpreter sees the change
+        result = testdir.runpytest_subprocess('--pylint')
+        result.assert_outcomes(passed=1)
+
+    @staticmethod
+    def test_changed_imported_module_relinted(testdir):
+        """Changed project module imported by the file produces a new cache key of the file"""
+        testdir.tmpdir.join('user.py').write('"""User"""\nimport helper\n\nhelper.func()\n')
+        testdir.tmpdir.join('helper.py').write('"""Helper"""\n\n\ndef func():\n    """Function"""\n')
+        result = testdir.runpytest_subprocess('--pylint', '-m', 'pylint')
+        result.assert_outcomes(passed=2)
+        testdir.tmpdir.join('helper.py').write('"""Helper"""\n')
+        result = testdir.runpytest_subprocess('--pylint', '-m', 'pylint')
+        result.assert_outcomes(passed=1, failed=1)
+        result.stdout.fnmatch_lines(['*Module \'helper\' has no \'func\' member (no-member)'])
+
+    @staticmethod
+    def test_imported_files(tmpdir):
+        """Imported modules of the top package directory are the project files of the key"""
+        from pytest_pylint_xdist_vcs import imported_files  # pylint: disable=import-outside-toplevel
+        package = tmpdir.mkdir('package')
+        for name in ('__init__.py', 'sibling.py', 'module.py'):
+            package.join(name).write('')
+        package.mkdir('sub').join('__init__.py').write('')
+        tmpdir.join('top.py').write('')
+        package.join('module.py').write('import os\nimport top\nfrom . import sibling\nfrom package.sub import name\n')
+        assert imported_files(package.join('module.py').strpath) == [
+            package.join('__init__.py').strpath, package.join('sibling.py').strpath,
+            package.join('sub', '__init__.py').strpath, tmpdir.join('top.py').strpath,
+        ]
+
+    @staticmethod
+    def test_cached_messages_use_msg_template(testdir):
+        """Replayed messages are formatted with the current msg-template"""
+        testdir.makepyfile('import sys')
+        testdir.runpytest('--pylint')
+        rcfile = testdir.makefile('rc', """
+[REPORTS]
+
+msg-template=start {msg_id} end
+""")
+        result = testdir.runpytest('--pylint', '--pylint-rcfile={0}'.format(rcfile.strpath))
+        assert 'start W0611 end' in result.stdout.str()
+
+    @staticmethod
+    def test_cached_records_hold_template_fields(testdir):
+        """Cached messages are records of the fields msg-template refers to only"""
+        testdir.makepyfile('import sys')
+        rcfile = testdir.makefile('rc', """
+[REPORTS]
+
+msg-template=start {msg_id} end
+""")
+        testdir.runpytest('--pylint', '--pylint-rcfile={0}'.format(rcfile.strpath))
+        entries = testdir.tmpdir.join('.pytest_cache', 'd', 'pylint').listdir('*.json')
+        assert [json.loads(entry.read()) for entry in entries] == [
+            {'messages': [['C0304'], ['C0114'], ['W0611']], 'omitted': 0, 'aborted': False}]
+
+    @staticmethod
+    def test_key_holds_message_fields(tmpdir):
+        """Records of different fields of the same file and config are stored under different keys"""
+        from pytest_pylint_xdist_vcs import LintResultCache  # pylint: disable=import-outside-toplevel
+        cache = LintResultCache(tmpdir)
+        path = tmpdir.join('module.py')
+        path.write('import sys\n')
+        # VCS mode formats messages with the default format whatever msg-template of the same pylintrc is
+        assert cache.key(path.strpath, fields=('msg_id',)) != cache.key(path.strpath, fields=('C', 'line', 'msg'))
+
+    @staticmethod
+    def test_no_cache(testdir):
+        """Check caching can be disabled"""
+        testdir.makepyfile('import sys')
+        testdir.runpytest('--pylint')
+        with patch('pylint_engine.LintRun', side_effect=AssertionError('pylint must run')):
+            result = testdir.runpytest('--pylint', '--pylint-no-cache')
+        assert 'pylint must run' in result.stdout.str()
+
+    @staticmethod
+    def test_lru_eviction(tmpdir):
+        """Least recently used entries are evicted beyond cache size"""
+        from pytest_pylint_xdist_vcs import LintResultCache  # pylint: disable=import-outside-toplevel
+        cache = LintResultCache(tmpdir, max_entries=2)
+        for age, key in enumerate(['old', 'used', 'new']):
+            cache.put(key, [])
+            os.utime(str(tmpdir.join(key + '.json')), (age, age))
+        assert cache.get('used') == []
+        cache.evict()
+        assert cache.get('old') is None
+        assert cache.get('used') == []
+        assert cache.get('new') == []
+
+    @staticmethod
+    def test_shared_store_between_checkouts(testdir, monkeypatch):
+        """Result published by one checkout is used by another one in a different directory"""
+        store = testdir.tmpdir.join('store')
+        for checkout in ('first', 'second'):
+            testdir.tmpdir.join(checkout, 'module.py').write('import sys\n', ensure=True)
+        monkeypatch.chdir(testdir.tmpdir.join('first'))
+        testdir.runpytest('--pylint', '--pylint-no-cache', '--pylint-shared-store={0}'.format(store))
+        monkeypatch.chdir(testdir.tmpdir.join('second'))
+        with patch('pylint_engine.LintRun', side_effect=AssertionError('pylint must not run')):
+            result = testdir.runpytest('--pylint', '--pylint-no-cache', '--pylint-shared-store={0}'.format(store))
+        assert 'pylint must not run' not in result.stdout.str()
+        result.stdout.fnmatch_lines(['*Unused import sys*'])
+
+    @staticmethod
+    def test_shared_store_eviction(tmpdir):
+        """Least recently used entries are evicted beyond store size"""
+        from pytest_pylint_xdist_vcs import SharedResultStore  # pylint: disable=import-outside-toplevel
+        store = SharedResultStore(tmpdir, tmpdir, max_bytes=5)
+        for age, key in enumerate(['old', 'used', 'new']):
+            store.put(key, [])
+            os.utime(str(tmpdir.join(key[:2], key + '.json')), (age, age))
+        assert store.get('used') == []
+        store.evict()
+        assert store.get('old') is None
+        assert store.get('used') == []
+        assert store.get('new') == []
+        # Other machines leave the store to the one which evicted it recently
+        store.put('next', [])
+        store.evict()
+        assert store.get('new') == []
+
+
+    @staticmethod
+    def test_shared_store_entries_readable(tmpdir):
+        """Entries get the mode of files created with the umask, other users of the store read them"""
+        from pytest_pylint_xdist_vcs import SharedResultStore  # pylint: disable=import-outside-toplevel
+        store = SharedResultStore(tmpdir, tmpdir)
+        umask = os.umask(0o022)
+        try:
+            store.put('entry', [])
+        finally:
+            os.umask(umask)
+        assert tmpdir.join('en', 'entry.json').stat().mode & 0o777 == 0o644
+
+    @staticmethod
+    def test_shared_store_read_only_entry(tmpdir):
+        """Entry which modification time can not be bumped is still used"""
+        from pytest_pylint_xdist_vcs import SharedResultStore  # pylint: disable=import-outside-toplevel
+        store = SharedResultStore(tmpdir, tmpdir)
+        store.put('entry', [['W0611']])
+        with patch('os.utime', side_effect=PermissionError('read-only')):
+            assert store.get('entry') == [['W0611']]
+
 def test_get_rel_path():
     """
     Verify our relative path function.
@@ -306,6 +1137,155 @@ def test_pylint_ignore_patterns():
     assert include_file('base.py', [], ignore_patterns) is False
 
 
+class TestTimings:
+    """Tests related to --pylint-timings instrumentation"""
+
+    @staticmethod
+    def test_timings_summary(testdir, file_with_multiple_tests): # pylint: disable=redefined-outer-name,unused-argument
+        """Pylint items and checkers are printed sorted by time without changing results"""
+        result = testdir.runpytest('-m', 'pylint', '--pylint', '--pylint-no-cache', '--pylint-timings')
+        result.assert_outcomes(passed=1, failed=1)
+        result.stdout.fnmatch_lines(['*= pylint timings =*', 'slowest 20 pylint items:'])
+        result.stdout.fnmatch_lines_random([
+            '*s test_ok.py?pylint?', '*s test_notok.py?pylint?', 'pylint checkers:', '*s typecheck', '*s astroid',
+        ])
+
+    @staticmethod
+    def test_timings_json_w_xdist(testdir, file_with_multiple_tests): # pylint: disable=redefined-outer-name,unused-argument
+        """Workers send checkers time to the controller which writes JSON file"""
+        result = testdir.runpytest('-m', 'pylint', '--pylint', '--pylint-no-cache', '-n=2',
+                                   '--pylint-timings-json=timings.json')
+        result.assert_outcomes(passed=1, failed=1)
+        timings = json.loads(testdir.tmpdir.join('timings.json').read())
+        assert sorted(timings['files']) == ['test_notok.py[pylint]', 'test_ok.py[pylint]']
+        assert {'astroid', 'imports', 'similarities', 'typecheck'} <= set(timings['checkers'])
+        assert all(seconds >= 0 for seconds in timings['checkers'].values())
+
+
+class TestReport:
+    """Tests related to --pylint-report structured messages"""
+
+    @staticmethod
+    def test_json_report(testdir, file_with_multiple_tests): # pylint: disable=redefined-outer-name,unused-argument
+        """Every message is a line of JSON array"""
+        result = testdir.runpytest('-m', 'pylint', '--pylint', '--pylint-report=report.json')
+        result.assert_outcomes(passed=1, failed=1)
+        lines = testdir.tmpdir.join('report.json').read().splitlines()
+        assert [json.loads(line.lstrip(',')) for line in lines[1:-1]] == json.loads('\n'.join(lines))
+        messages = json.loads('\n'.join(lines))
+        assert {'path': 'test_notok.py', 'msg_id': 'W0611', 'symbol': 'unused-import', 'msg': 'Unused import sys',
+                'category': 'warning', 'line': 1, 'column': 0} in messages
+        assert all(message['path'] == 'test_notok.py' for message in messages)
+
+        # The cached results are reported too
+        result = testdir.runpytest('-m', 'pylint', '--pylint', '--pylint-report=report.json')
+        result.assert_outcomes(passed=1, failed=1)
+        assert json.loads(testdir.tmpdir.join('report.json').read()) == messages
+
+    @staticmethod
+    def test_sarif_report_w_xdist(testdir, file_with_multiple_tests): # pylint: disable=redefined-outer-name,unused-argument
+        """Workers send messages to the controller which writes SARIF results"""
+        result = testdir.runpytest('-m', 'pylint', '--pylint', '-n=2', '--pylint-report=report.sarif')
+        result.assert_outcomes(passed=1, failed=1)
+        sarif = json.loads(testdir.tmpdir.join('report.sarif').read())
+        assert sarif['version'] == '2.1.0'
+        assert sarif['runs'][0]['tool']['driver']['name'] == 'pylint'
+        results = sarif['runs'][0]['results']
+        assert {
+            'ruleId': 'W0611',
+            'level': 'warning',
+            'message': {'text': 'Unused import sys (unused-import)'},
+            'locations': [{'physicalLocation': {
+                'artifactLocation': {'uri': 'test_notok.py', 'uriBaseId': '%SRCROOT%'},
+                'region': {'startLine': 1, 'startColumn': 1},
+            }}],
+        } in results
+
+    @staticmethod
+    def test_invalid_report(testdir):
+        """Report format is given by the file extension"""
+        result = testdir.runpytest('--pylint', '--pylint-report=report.xml')
+        assert result.ret == ExitCode.USAGE_ERROR
+
+
+class TestLintJobs:
+    """Tests related to linting in --pylint-jobs process pool"""
+
+    @staticmethod
+    def test_lint_in_pool(testdir, file_with_multiple_tests): # pylint: disable=redefined-outer-name,unused-argument
+        """Pylint items report results of the files linted by the pool"""
+        with patch('pytest_pylint_xdist_vcs.multiprocessing.Pool', wraps=multiprocessing.Pool) as pool_mock:
+            result = testdir.runpytest('-m', 'pylint', '--pylint', '--pylint-no-cache', '--pylint-jobs=2')
+        pool_mock.assert_called_once_with(2)
+        result.assert_outcomes(passed=1, failed=1)
+        assert 'Unused import sys' in result.stdout.str()
+
+    @staticmethod
+    def test_lint_batches_in_pool(testdir):
+        """Batches are linted by the pool with cache and timings working as in process"""
+        for name, source in [('first.py', '"""Fine module"""\n'), ('second.py', 'import sys'),
+                             ('third.py', '"""Fine module"""\n')]:
+            testdir.tmpdir.join(name).write(source)
+        result = testdir.runpytest('--pylint', '--pylint-jobs=auto', '--pylint-batch-size=2', '--pylint-timings')
+        result.assert_outcomes(passed=2, failed=1)
+        result.stdout.fnmatch_lines(['*s typecheck'])
+        with patch('pylint_engine.lint_files', side_effect=AssertionError('files must not be linted')):
+            result = testdir.runpytest('--pylint', '--pylint-jobs=2', '--pylint-batch-size=2')
+        result.assert_outcomes(passed=2, failed=1)
+
+    @staticmethod
+    def test_prefetch(testdir, file_with_multiple_tests): # pylint: disable=redefined-outer-name,unused-argument
+        """Pylint items run after the other tests, their files are linted by single process pool"""
+        with patch('pytest_pylint_xdist_vcs.multiprocessing.Pool', wraps=multiprocessing.Pool) as pool_mock:
+            result = testdir.runpytest('--pylint', '--pylint-no-cache', '--pylint-prefetch', '-v')
+        pool_mock.assert_called_once_with(1)
+        result.assert_outcomes(passed=3, failed=1)
+        result.stdout.re_match_lines([
+            r'test_ok\.py::test_hello_world PASSED',
+            r'test_ok\.py::test_assertion PASSED',
+            r'test_(not)?ok\.py\[pylint\] ',
+            r'test_(not)?ok\.py\[pylint\] ',
+        ])
+
+    @staticmethod
+    def test_invalid_jobs(testdir):
+        """Number of jobs is either integer or auto"""
+        result = testdir.runpytest('--pylint', '--pylint-jobs=many')
+        assert result.ret == ExitCode.USAGE_ERROR
+
+
+def test_ignore_matcher_dirs():
+    """Directories are ignored if all the files below them are"""
+    from pytest_pylint_xdist_vcs import IgnoreMatcher  # pylint: disable=import-outside-toplevel
+    matcher = IgnoreMatcher(['migrations'], ['build/', 'vendor.*', '.*_pb2.py$'])
+    assert matcher.ignores_dir('app/migrations') is True
+    assert matcher.ignores_dir('app/migrations_helpers') is False
+    assert matcher.ignores_dir('build') is True
+    assert matcher.ignores_dir('builder') is False
+    assert matcher.ignores_dir('vendored/lib') is True
+    assert matcher.ignores_dir('api_pb2.py') is False
+    assert matcher.ignores('api_pb2.py') is True
+
+
+def test_pylintrc_ignored_dirs_not_collected(testdir):
+    """Directories ignored by pylintrc are pruned from collection when running lint only"""
+    rcfile = testdir.makefile('rc', """
+[MASTER]
+
+ignore = CVS, migrations
+ignore-patterns = generated.*
+""")
+    for dirname in ('migrations', 'generated'):
+        testdir.mkdir(dirname).join('test_broken.py').write('def broken(:\n')
+    testdir.makepyfile('import sys')
+
+    result = testdir.runpytest('--pylint', '-m', 'pylint', '--pylint-rcfile={0}'.format(rcfile.strpath))
+    result.assert_outcomes(failed=1)
+
+    result = testdir.runpytest('--pylint', '--pylint-rcfile={0}'.format(rcfile.strpath))
+    assert '2 errors' in result.stdout.str()
+
+
 class TestDistributedLinting:
     """Tests related to distibuted linting with xdist"""
 
@@ -332,6 +1312,77 @@ class TestDistributedLinting:
         result.stdout.fnmatch_lines_random(['*gw0*', '*gw1*'])
         result.stdout.re_match_lines([r'=+ FAILURES =+', r'_+ \[pylint\] test_notok\.py _+'])
 
+    @staticmethod
+    def test_lint_durations_recorded(testdir, file_with_multiple_tests): # pylint: disable=redefined-outer-name,unused-argument
+        """Durations of linted files are kept in pytest cache, cached results keep them"""
+        testdir.runpytest('-m', 'pylint', '--pylint', '-n=2')
+        durations_file = testdir.tmpdir.join('.pytest_cache', 'v', 'pylint', 'durations')
+        durations = json.loads(durations_file.read())
+        assert sorted(durations) == ['test_notok.py[pylint]', 'test_ok.py[pylint]']
+
+        testdir.runpytest('-m', 'pylint', '--pylint', '-n=2')
+        assert json.loads(durations_file.read()) == durations
+
+    @staticmethod
+    def test_longest_first_w_xdist(testdir):
+        """Files never linted are estimated by size with duration per byte of recorded ones"""
+        for name, lines in [('test_big.py', 300), ('test_unseen.py', 200), ('test_slow.py', 1)]:
+            testdir.tmpdir.join(name).write('"""Module"""\n' + 'VALUE = 1\n' * (lines - 1))
+        testdir.tmpdir.join('.pytest_cache', 'v', 'pylint', 'durations').write(
+            json.dumps({'test_big.py[pylint]': 0.5, 'test_slow.py[pylint]': 100.0}), ensure=True)
+        result = testdir.runpytest('-m', 'pylint', '--pylint', '--pylint-no-cache', '-n=1', '-v')
+        result.stdout.re_match_lines([
+            r'\[gw0\] .* test_slow\.py\[pylint\]',
+            r'\[gw0\] .* test_unseen\.py\[pylint\]',
+            r'\[gw0\] .* test_big\.py\[pylint\]',
+        ])
+
+    @staticmethod
+    def test_package_affinity_w_xdist(testdir):
+        """Files of a package are linted by one worker"""
+        durations = {}
+        for package, cost in [('pkg_a', 0.5), ('pkg_b', 0.5), ('solo_a', 2.0), ('solo_b', 2.0)]:
+            for name in ('first.py', 'second.py') if cost < 1 else ('only.py',):
+                testdir.tmpdir.join(package, name).write('"""Module"""\n', ensure=True)
+                durations['{0}/{1}[pylint]'.format(package, name)] = cost
+        testdir.tmpdir.join('.pytest_cache', 'v', 'pylint', 'durations').write(json.dumps(durations), ensure=True)
+        result = testdir.runpytest('-m', 'pylint', '--pylint', '--pylint-no-cache', '-n=2', '-v',
+                                   '--pylint-affinity=package')
+        result.assert_outcomes(passed=6)
+        result.stdout.fnmatch_lines(['scheduling tests via PyLintAffinityScheduling'])
+        workers = dict(
+            reversed(match.groups()) for match in
+            (re.search(r'\[(gw\d)\] .* (\S+)\[pylint\]', line) for line in result.outlines) if match
+        )
+        assert workers['pkg_a/first.py'] == workers['pkg_a/second.py']
+        assert workers['pkg_b/first.py'] == workers['pkg_b/second.py']
+
+    @staticmethod
+    def test_affinity_clusters(tmpdir):
+        """Importing files are clustered before the files of a directory, up to the cost limit"""
+        from pytest_pylint_xdist_vcs import affinity_clusters  # pylint: disable=import-outside-toplevel
+        sources = {
+            'app/__init__.py': '', 'app/views.py': 'from lib import models\n', 'app/urls.py': 'import os\n',
+            'lib/__init__.py': '', 'lib/models.py': '', 'lib/utils.py': '',
+        }
+        for name, source in sources.items():
+            tmpdir.join(name).write(source, ensure=True)
+        costs = {tmpdir.join(name).strpath: 1.0 for name in sources}
+        clusters = affinity_clusters(costs, 'imports', 2.0)
+        assert clusters[tmpdir.join('app', 'views.py').strpath] == clusters[tmpdir.join('lib', 'models.py').strpath]
+        assert clusters[tmpdir.join('app', '__init__.py').strpath] == clusters[tmpdir.join('app', 'urls.py').strpath]
+        assert clusters[tmpdir.join('lib', '__init__.py').strpath] == clusters[tmpdir.join('lib', 'utils.py').strpath]
+        assert len(set(clusters.values())) == 3
+        clusters = affinity_clusters(costs, 'package', 3.0)
+        assert len(set(clusters.values())) == 2
+
+    @staticmethod
+    def test_affinity_with_batches(testdir):
+        """Batches of files in collection order would split the clusters"""
+        result = testdir.runpytest('--pylint', '--pylint-affinity=package', '--pylint-batch-size=2')
+        assert result.ret == ExitCode.USAGE_ERROR
+
+
 class TestVCS:
     """Tests related to VCS mode of plugin"""
 
@@ -370,7 +1421,7 @@ class TestVCS:
         """Test the plugin skips non vcs tracked file in vcs mode"""
         with patch('subprocess.check_output', side_effect=mock_svn_console_command):
             result = testdir.runpytest('-vv', '-s', '-n0', '--pylint-vcs', '-m', 'pylint', MOCKED_REPO_LOCAL_PATH)
-        assert result.parseoutcomes() == {'deselected': 2}
+        result.stdout.fnmatch_lines(['*collected 0 items'])
         assert result.ret == ExitCode.NO_TESTS_COLLECTED
 
     @staticmethod
@@ -385,6 +1436,70 @@ class TestVCS:
         ])
         result.assert_outcomes(passed=1)
 
+    @staticmethod
+    def test_unchanged_paths_not_collected(testdir, added_nested_file_svn_status): # pylint: disable=redefined-outer-name,unused-argument
+        """Check paths without changed files are pruned in lint only run and collected otherwise"""
+        with patch('subprocess.check_output', side_effect=mock_svn_console_command):
+            result = testdir.runpytest('-n0', '--pylint-vcs', '-m', 'pylint', MOCKED_REPO_LOCAL_PATH)
+        result.stdout.fnmatch_lines(['*collected 1 item'])
+        result.assert_outcomes(failed=1)
+
+        with patch('subprocess.check_output', side_effect=mock_svn_console_command):
+            result = testdir.runpytest('-n0', '--pylint-vcs', MOCKED_REPO_LOCAL_PATH)
+        result.stdout.fnmatch_lines(['*collected 3 items'])
+        result.assert_outcomes(passed=2, failed=1)
+
+        with patch('subprocess.check_output', side_effect=mock_svn_console_command):
+            result = testdir.runpytest('-n0', '--pylint-vcs', '-m', 'pylint and not slow', MOCKED_REPO_LOCAL_PATH)
+        result.stdout.fnmatch_lines(['*collected 1 item'])
+
+        with patch('subprocess.check_output', side_effect=mock_svn_console_command):
+            result = testdir.runpytest('-n0', '--pylint-vcs', '-m', 'pylint or not slow', MOCKED_REPO_LOCAL_PATH)
+        result.stdout.fnmatch_lines(['*collected 3 items'])
+        result.assert_outcomes(passed=2, failed=1)
+
+    @staticmethod
+    def test_selects_lint_items_only():
+        """Mark expressions false for every item without the pylint mark select only lint items"""
+        from pytest_pylint_xdist_vcs import selects_lint_items_only  # pylint: disable=import-outside-toplevel
+        for markexpr in ('pylint', 'pylint and not slow', '(pylint or slow) and not slow', 'pylint and pylint'):
+            assert selects_lint_items_only(markexpr), markexpr
+        for markexpr in ('', 'slow', 'pylint or slow', 'not slow', 'pylint or not pylint', 'pylint and (', 'a.b'):
+            assert not selects_lint_items_only(markexpr), markexpr
+
+    @staticmethod
+    def test_vcs_state_shipped_to_xdist_workers(testdir, added_file_svn_status): # pylint: disable=redefined-outer-name,unused-argument
+        """Check xdist workers lint files changed according to the controller, svn is mocked only there"""
+        with patch('subprocess.check_output', side_effect=mock_svn_console_command) as svn_mock:
+            result = testdir.runpytest('-vv', '-n2', '--pylint-vcs', '-m', 'pylint', MOCKED_REPO_LOCAL_PATH)
+        assert svn_mock.call_count == 2
+        result.stdout.fnmatch_lines(['*PASSED*test/mocked_repo/python_package/test_file_one.py*'])
+        result.assert_outcomes(passed=1)
+
+    @staticmethod
+    def test_lint_files_changed_since(testdir, modified_file_svn_status): # pylint: disable=redefined-outer-name,unused-argument
+        """Check the revision range with working copy changes is summarized by single svn diff"""
+        with patch('subprocess.check_output', side_effect=mock_svn_console_command) as svn_mock:
+            result = testdir.runpytest('-n0', '--pylint-vcs', '-m', 'pylint', '--pylint-vcs-since=73000',
+                                       '--pylint-vcs-working-copy', MOCKED_REPO_LOCAL_PATH)
+        diff_calls = [call[0][0] for call in svn_mock.call_args_list if call[0][0][:2] == ['svn', 'diff']]
+        assert diff_calls == [['svn', 'diff', '--summarize', '--xml', '-r', '73000', MOCKED_REPO_LOCAL_PATH]]
+        result.assert_outcomes(passed=1)
+
+    @staticmethod
+    def test_lint_files_changed_since_unknown_revision(testdir, modified_file_svn_status): # pylint: disable=redefined-outer-name,unused-argument
+        """Check svn failing on the --pylint-vcs-since revision is a usage error"""
+        def svn_command(command, *args, **kwargs):
+            if command[:2] == ['svn', 'diff']:
+                raise subprocess.CalledProcessError(1, command)
+            return mock_svn_console_command(command, *args, **kwargs)
+
+        with patch('subprocess.check_output', side_effect=svn_command):
+            result = testdir.runpytest('-n0', '--pylint-vcs', '-m', 'pylint', '--pylint-vcs-since=99999',
+                                       MOCKED_REPO_LOCAL_PATH)
+        assert result.ret == pytest.ExitCode.USAGE_ERROR
+        result.stderr.fnmatch_lines(['*--pylint-vcs-since=99999: Svn revision 99999 not found*'])
+
     @staticmethod
     def test_lint_modified_file(testdir, modified_file_svn_status): # pylint: disable=redefined-outer-name,unused-argument
         """Check linting on vcs modified file"""
@@ -401,7 +1516,7 @@ class TestVCS:
         """Check linting on vcs deleted file"""
         with patch('subprocess.check_output', side_effect=mock_svn_console_command):
             result = testdir.runpytest('-vv', '-s', '-n0', '--pylint-vcs', '-m', 'pylint', MOCKED_REPO_LOCAL_PATH)
-        assert result.parseoutcomes() == {'deselected': 2}
+        result.stdout.fnmatch_lines(['*collected 0 items'])
         assert result.ret == ExitCode.NO_TESTS_COLLECTED
 
     @staticmethod
@@ -411,3 +1526,31 @@ class TestVCS:
             result = testdir.runpytest('-n0', '--pylint-vcs', '-m', 'pylint', MOCKED_REPO_LOCAL_PATH)
         result.stdout.fnmatch_lines('No VCS working copy detected. VCS linting mode disabled: linting all the files')
         result.assert_outcomes(passed=2, failed=1)
+
+    @staticmethod
+    def test_lint_git_changed_files(testdir, monkeypatch):
+        """Check linting only files changed in git working copy"""
+        for variable, value in [('GIT_AUTHOR_NAME', 'tester'), ('GIT_COMMITTER_NAME', 'tester'),
+                                ('GIT_AUTHOR_EMAIL', 'tester@example.com'),
+                                ('GIT_COMMITTER_EMAIL', 'tester@example.com')]:
+            monkeypatch.setenv(variable, value)
+        testdir.makepyfile(unchanged='import os', changed='import sys')
+        for command in (['init', '-q'], ['add', '.'], ['commit', '-q', '-m', 'initial']):
+            subprocess.check_call(['git'] + command, cwd=str(testdir.tmpdir))
+        testdir.makepyfile(changed='"""Changed module"""')
+        subprocess.check_call(['git', 'commit', '-q', '-a', '-m', 'second'], cwd=str(testdir.tmpdir))
+        testdir.makepyfile(added='import json')
+        subprocess.check_call(['git', 'add', 'added.py'], cwd=str(testdir.tmpdir))
+
+        result = testdir.runpytest('-v', '--pylint-vcs', '-m', 'pylint')
+        result.stdout.fnmatch_lines_random([
+            'VCS working copy detected. VCS linting mode enabled',
+            '*added.py*FAILED*',
+            '*changed.py*FAILED*',
+        ])
+        assert 'unchanged.py' not in result.stdout.str()
+        result.assert_outcomes(failed=2)
+
+        result = testdir.runpytest('--pylint-vcs', '-m', 'pylint', '--pylint-vcs-since=no-such-ref')
+        assert result.ret == pytest.ExitCode.USAGE_ERROR
+        result.stderr.fnmatch_lines(['*--pylint-vcs-since=no-such-ref: Git revision no-such-ref not found*'])
@@ -1,23 +1,61 @@
 """Testing module for svn module functions"""
+import subprocess
 from unittest.mock import patch
 
+import pytest
+
 import svn
 
 
 SVN_CHANGED_FILES_OUTPUT_STUB = \
-b"""
-M       src/ConfigurationManagement/RadioAutomataControllerNG/StateControllers/IDeviceStateController.hpp
-A       /var/fpwork/ultra_user/sub_domain_ctrl/test/py/tests/test_cases/single_core/all_systems/deployment.py
-M       /var/fpwork/ultra_user/sub_domain_ctrl/test/py/tests/test_cases/single_core/all_systems/initial_transcoding.py
- M       /var/fpwork/ultra_user/sub_domain_ctrl/test/py/tests/test_cases/single_core/all_systems
-D       /var/fpwork/ultra_user/sub_domain_ctrl/test/py/tests/helpers/calculations/processes.py
-M       /var/fpwork/ultra_user/sub_domain_ctrl/test/py/tests/helpers/general_events.py
-M       /var/fpwork/ultra_user/sub_domain_ctrl/test/py/tests/logs
-M       /var/fpwork/ultra_user/sub_domain_ctrl/test/py/log
-A       /var/fpwork/ultra_user/sub_domain_ctrl/test/ut/tests/ConfigurationManagement/ParamsReaderFixture.hpp
-D       /var/fpwork/ultra_user/sub_domain_ctrl/test/ut/tests/ConfigurationManagement/ParamsReaderTests.cpp
+"""<?xml version="1.0" encoding="UTF-8"?>
+<diff>
+<paths>
+<path item="modified" props="none" kind="file">/var/fpwork/sdc/src/Controllers/IDeviceStateController.hpp</path>
+<path item="added" props="none" kind="file">/var/fpwork/sdc/test/py/tests/single_core/deployment.py</path>
+<path item="modified" props="none" kind="file">/var/fpwork/sdc/test/py/tests/v1.2/initial_transcoding.py</path>
+<path item="none" props="modified" kind="dir">/var/fpwork/sdc/test/py/tests/single_core</path>
+<path item="deleted" props="none" kind="file">/var/fpwork/sdc/test/py/tests/helpers/processes.py</path>
+<path item="replaced" props="none" kind="file">/var/fpwork/sdc/test/py/tests/helpers/événements généraux.py</path>
+<path item="modified" props="none" kind="dir">/var/fpwork/sdc/test/py/tests/logs.py</path>
+<path item="added" props="none" kind="file">/var/fpwork/sdc/test/ut/tests/ParamsReaderFixture.hpp</path>
+</paths>
+</diff>
+""".encode()
+
+SVN_STATUS_STUB = \
+b"""<?xml version="1.0" encoding="UTF-8"?>
+<status>
+<target path="/var/fpwork/sdc">
+<entry path="/var/fpwork/sdc/edited.py">
+<wc-status item="modified" props="none" revision="88160"><commit revision="87892"/></wc-status>
+</entry>
+<entry path="/var/fpwork/sdc/unversioned.py">
+<wc-status item="unversioned" props="none"></wc-status>
+</entry>
+<entry path="/var/fpwork/sdc/test/py/tests/single_core/deployment.py">
+<wc-status item="added" props="none" revision="-1"></wc-status>
+</entry>
+</target>
+</status>
+"""
+
+SVN_INFO_XML_STUB = \
+b"""<?xml version="1.0" encoding="UTF-8"?>
+<info>
+<entry kind="dir" path="/var/fpwork/sdc" revision="88160">
+<url>https://repo.de-fault.com/svnroot/sub_domain_ctrl/trunk</url>
+<repository>
+<root>https://repo.de-fault.com/svnroot/sub_domain_ctrl</root>
+<uuid>5d1c24bb-f610-4327-a4d3-8a65489cf8183</uuid>
+</repository>
+<commit revision="87892"><author>ultra_user</author></commit>
+</entry>
+</info>
 """
 
+ROOT = '/var/fpwork/sdc'
+
 SVN_INFO_STUB = \
 b"""
 Path: /var/fpwork/ultra_user/sub_domain_ctrl
@@ -35,13 +73,69 @@ Last Changed Date: 2019-10-11 14:47:21 +0200 (Fri, 11 Oct 2019)
 """
 
 
+def mock_svn(command, *args, **kwargs): # pylint: disable=unused-argument
+    """Output of svn ``--xml`` command by its subcommand"""
+    return {'diff': SVN_CHANGED_FILES_OUTPUT_STUB, 'status': SVN_STATUS_STUB, 'info': SVN_INFO_XML_STUB}[command[1]]
+
+
 @patch('subprocess.check_output', return_value=SVN_CHANGED_FILES_OUTPUT_STUB)
-def test_changed_filepaths_generation(checkoutput_mock): # pylint: disable=unused-argument
-    """This tests ability for svn module to get all changed python files in working copy from svn info output"""
-    root = '/var/fpwork/ultra_user/sub_domain_ctrl'
-    lines = svn.get_mod_files(root)
-    assert len(lines) == 3
-    assert all(path.endswith('.py') for path in lines)
+def test_changed_filepaths_generation(checkoutput_mock):
+    """This tests ability for svn module to get all changed python files from svn diff xml output"""
+    paths = svn.get_mod_files(ROOT)
+    assert paths == [
+        ROOT + '/test/py/tests/single_core/deployment.py',
+        ROOT + '/test/py/tests/v1.2/initial_transcoding.py',
+        ROOT + '/test/py/tests/helpers/événements généraux.py',
+    ]
+    checkoutput_mock.assert_called_once_with(['svn', 'diff', '--summarize', '--xml', '-r', 'PREV:COMMITTED', ROOT])
+
+
+@patch('subprocess.check_output', side_effect=mock_svn)
+def test_changed_filepaths_since(checkoutput_mock):
+    """This tests range of revisions is summarized by single svn call"""
+    svn.get_mod_files(ROOT, since='87000')
+    checkoutput_mock.assert_called_once_with(['svn', 'diff', '--summarize', '--xml', '-r', '87000:COMMITTED', ROOT])
+
+
+@patch('subprocess.check_output', side_effect=mock_svn)
+def test_changed_filepaths_of_working_copy(checkoutput_mock):
+    """This tests the range and the working copy changes are summarized by single svn call"""
+    paths = svn.get_mod_files(ROOT, since='87000', working_copy=True)
+    checkoutput_mock.assert_called_once_with(['svn', 'diff', '--summarize', '--xml', '-r', '87000', ROOT])
+    assert len(paths) == 3
+
+
+@patch('subprocess.check_output', side_effect=mock_svn)
+def test_range_memoized(checkoutput_mock, tmpdir):
+    """This tests files of range of resolved revisions are reused, working copy is checked by svn status"""
+    paths = svn.get_mod_files(ROOT, since='87000', cache_dir=str(tmpdir))
+    assert [call[0][0][1] for call in checkoutput_mock.call_args_list] == ['info', 'diff']
+    checkoutput_mock.reset_mock()
+
+    assert svn.get_mod_files(ROOT, since='87000', cache_dir=str(tmpdir)) == paths
+    assert [call[0][0][1] for call in checkoutput_mock.call_args_list] == ['info']
+    checkoutput_mock.reset_mock()
+
+    paths = svn.get_mod_files(ROOT, since='87000', working_copy=True, cache_dir=str(tmpdir))
+    assert [call[0][0][1] for call in checkoutput_mock.call_args_list] == ['info', 'status']
+    assert paths[-1] == ROOT + '/edited.py'
+    assert len(paths) == 4
+
+
+@patch('subprocess.check_output', side_effect=mock_svn)
+def test_range_of_remote_revision_not_memoized(checkoutput_mock, tmpdir):
+    """This tests range starting at revision not resolved locally is summarized every time"""
+    svn.get_mod_files(ROOT, since='HEAD', cache_dir=str(tmpdir))
+    assert [call[0][0][1] for call in checkoutput_mock.call_args_list] == ['info', 'diff']
+    assert not tmpdir.listdir()
+
+
+def test_changed_filepaths_since_unknown_revision():
+    """This tests svn failing on explicitly given revision is an error naming the revision"""
+    error = subprocess.CalledProcessError(1, ['svn', 'diff'])
+    with patch('subprocess.check_output', side_effect=error), \
+            pytest.raises(ValueError, match='Svn revision no-such-rev not found'):
+        svn.get_mod_files(ROOT, since='no-such-rev')
 
 
 @patch('subprocess.check_output', return_value=SVN_INFO_STUB)